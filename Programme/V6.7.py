@@ -4,71 +4,1939 @@ import csv
 import unicodedata
 import tkinter as tk
 from tkinter import filedialog, ttk
-from collections import Counter
+from collections import Counter, OrderedDict
 import webbrowser
+import argparse
+import time
+import os
+import shutil
+import mmap
+from array import array
+import socket
+import struct
+import gzip
+import bz2
+import lzma
+import codecs
+import threading
+import queue
+import sys
+import hashlib
+import tempfile
+import glob
+import heapq
+import math
+from html import escape
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 # ---------------- pattern tcpdump
+# proto : facultatif, juste après les adresses ("Flags [" = TCP), ne change rien aux autres groupes.
+# Sans port (ICMP, GRE, ...) : l'adresse est gardée entière, son dernier octet n'est pas un port
+PROTOCOLES_SANS_PORT = ("gre", "esp", "ah", "igmp", "vrrp", "ospf", "pim", "carp", "ip-proto", "ipip")
+PROTO_SANS_PORT = "|".join(re.escape(nom) for nom in PROTOCOLES_SANS_PORT)
 pattern = re.compile(
-    r'(?P<time>\d{2}:\d{2}:\d{2})\.\d+\s+IP\s+'
-    r'(?P<src>[^ ]+)\s+>\s+(?P<dst>[^:]+):.*length\s+(?P<length>\d+)'
+    r'(?P<time>\d{2}:\d{2}:\d{2})\.(?P<frac>\d+)\s+IP\s+'
+    r'(?P<src>[^ ]+)\s+>\s+(?P<dst>[^:]+):(?P<proto> Flags \[| UDP,| ICMP| sctp| (?i:' + PROTO_SANS_PORT + r'))?'
+    r'.*length\s+(?P<length>\d+)'
 )
+# pas de jeton reconnu : décodeur applicatif (DNS, NTP, ...), donc UDP comme dans extraire_ligne_ip ;
+# jeton sans port : "ip"
+PROTOS = {" Flags [": "tcp", " UDP,": "udp", " ICMP": "icmp", " sctp": "sctp", None: "udp"}
+AVEC_PORT = ("tcp", "udp", "sctp")  # seuls protocoles dont le dernier champ de l'adresse est un port
+
+# ---------------- même pattern en octets, pour la lecture mmap
+# \s devient [^\S\n] et [^ ] / [^:] excluent \n : une trame ne déborde jamais sur la ligne suivante
+pattern_octets = re.compile(
+    rb'(?P<time>\d{2}:\d{2}:\d{2})\.(?P<frac>\d+)[^\S\n]+IP[^\S\n]+'
+    rb'(?P<src>[^ \n]+)[^\S\n]+>[^\S\n]+(?P<dst>[^:\n]+):'
+    rb'(?P<proto> Flags \[| UDP,| ICMP| sctp| (?i:' + PROTO_SANS_PORT.encode("ascii") + rb'))?'
+    rb'.*length[^\S\n]+(?P<length>\d+)'
+)
+PROTOS_OCTETS = {b" Flags [": "tcp", b" UDP,": "udp", b" ICMP": "icmp", b" sctp": "sctp", None: "udp"}
+
+# ---------------- horodatage entier : microsecondes depuis minuit du 1er jour de capture
+# (l'heure du jour et les tranches horaires s'obtiennent par division entière)
+JOUR_US = 86400 * 1000000
+SAUT_ARRIERE_MAX = 60 * 1000000  # un recul plus grand que ça : on est passé au jour suivant
+ECHELLE_FRACTION = (0, 100000, 10000, 1000, 100, 10, 1)  # nombre de chiffres -> facteur vers les µs
+
+class Horloge:
+    # sortie texte de tcpdump : HH:MM:SS.ffffff sans date, passage de minuit détecté au recul de l'heure
+    def __init__(self):
+        self.jour = 0
+        self.precedent = None
+        # chemin rapide : une capture enchaîne des centaines de trames dans la même seconde,
+        # HH:MM:SS n'est découpé et converti que lorsqu'il change
+        self.hms = None
+        self.base = 0
+        self.conversions = 0
+
+    def microsecondes(self, hms, fraction):  # str ou bytes
+        if hms != self.hms:
+            self.hms = hms
+            self.base = ((int(hms[0:2]) * 60 + int(hms[3:5])) * 60 + int(hms[6:8])) * 1000000
+            self.conversions += 1
+        fraction = fraction[:6]  # 6 chiffres (µs), 9 avec tcpdump --nano
+        us = self.base + int(fraction) * ECHELLE_FRACTION[len(fraction)]
+        if self.precedent is not None and us < self.precedent - SAUT_ARRIERE_MAX:
+            self.jour += 1
+        self.precedent = us
+        return self.jour * JOUR_US + us
+
+# part des trames dont la seconde était déjà convertie (cumulée sur les lectures texte et mmap)
+STATS_HORODATAGE = Counter()
+
+def stats_horodatage():
+    trames, conversions = STATS_HORODATAGE["trames"], STATS_HORODATAGE["conversions"]
+    return {
+        "trames": trames,
+        "conversions": conversions,
+        "taux": 1 - conversions / trames if trames else 0.0
+    }
+
+class HorlogeEpoque:
+    # pcap / pcapng : horodatage absolu, ramené à minuit (heure locale) du jour du 1er paquet
+    def __init__(self):
+        self.minuit = None
+
+    def microsecondes(self, epoque_us):
+        if self.minuit is None:
+            secondes = epoque_us // 1000000
+            heure = time.localtime(secondes)
+            self.minuit = (secondes - (heure.tm_hour * 3600 + heure.tm_min * 60 + heure.tm_sec)) * 1000000
+        return epoque_us - self.minuit
+
+# ---------------- extraction IP avec normalisation (une passe, sans re.sub)
+# adresse TCP / UDP seulement (AVEC_PORT) : le dernier champ est toujours le port, chiffré
+# ou nom de service ; "" s'il n'y en a pas
+def separer_ip_port(champ):
+    champ = champ.partition(":")[0]      # enlever le ":" de fin d'adresse
+    hote, point, port = champ.rpartition(".")
+    if not point:
+        return champ, ""
+    return hote, port                    # BP-Linux8.34862, BP-Linux8.ssh, 184.107.43.74.http
 
-# ---------------- extraction IP avec normalisation
 def extraire_ip(champ):
-    champ = champ.split(":")[0]          # enlever le port
-    champ = re.sub(r'\.https$', '', champ)
-    champ = re.sub(r'\.http$', '', champ)
-    champ = re.sub(r'\.\d+$', '', champ) # BP-Linux8.34862 → BP-Linux8
-    return champ
+    return separer_ip_port(champ)[0]
+
+# ---------------- caches bornés (les mêmes hôte.port reviennent à chaque trame d'un flux)
+TAILLE_CACHE_IP = 65536  # au-delà, les entrées les moins récemment utilisées sont évincées
+
+separer_ip_port_cache = lru_cache(maxsize=TAILLE_CACHE_IP)(separer_ip_port)
+
+def extraire_ip_cache(champ):  # même cache pour tous les lecteurs : une seule table, des stats complètes
+    return separer_ip_port_cache(champ)[0]
+
+def stats_cache_ip():
+    info = separer_ip_port_cache.cache_info()
+    appels = info.hits + info.misses
+    return {
+        "succes": info.hits,
+        "echecs": info.misses,
+        "taux": info.hits / appels if appels else 0.0,
+        "taille": info.currsize,
+        "max": info.maxsize
+    }
 
 # ---------------- normalisation texte (minuscules, sans accents ni ponctuation)
+# caractères ASCII ni alphanumériques ni espaces : supprimés d'un coup par str.translate
+SUPPRIMER_ASCII = str.maketrans("", "", "".join(
+    c for c in map(chr, range(128)) if not (c.isalnum() or c.isspace())))
+
 def normaliser_texte(text):
+    if text.isascii():  # chemin rapide : NFD et accents sans effet sur l'ASCII
+        return ' '.join(text.lower().translate(SUPPRIMER_ASCII).split())
     text = text.lower()
     text = ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
     text = ''.join(c if c.isalnum() or c.isspace() else '' for c in text)
     text = ' '.join(text.split())
     return text
 
-# ---------------- lecture fichier
-def lire_fichier(chemin):
-    trames = []
-    with open(chemin, "r", encoding="utf-8") as f:
-        for ligne in f:
-            m = pattern.search(ligne)
+# les mêmes hôtes reviennent sur chaque ligne du CSV
+normaliser_texte_cache = lru_cache(maxsize=65536)(normaliser_texte)
+
+# ---------------- pré-filtre structurel des lignes (captures tcpdump -x / -X)
+# la continuation hexa (\t0x0000:  4512 00a0 ...) ne contient jamais d'entête : pas de regex.
+# Toute autre ligne passe par la regex (une trame peut figurer sur une ligne inconnue)
+def ligne_hexa(ligne):
+    return ligne[:1] == "\t"
+
+# ---------------- extraction des trames d'une suite de lignes
+# la regex reste le découpeur : un split() aussi strict qu'elle n'est pas plus rapide
+
+# horloge : à passer d'un bloc à l'autre en lecture continue (suivi, entrée standard),
+# sinon chaque bloc repartirait au jour 0 et le passage de minuit serait perdu
+def iterer_trames_lignes(lignes, horloge=None):
+    chercher = pattern.search
+    separer = separer_ip_port_cache
+    horloge = Horloge() if horloge is None else horloge
+    microsecondes = horloge.microsecondes
+    conversions = horloge.conversions
+    nb = 0
+    try:
+        for ligne in lignes:
+            if ligne_hexa(ligne):
+                continue
+            m = chercher(ligne)
             if m:
-                d = m.groupdict()
-                trames.append({
-                    "time": d["time"],
-                    "src": extraire_ip(d["src"]),
-                    "dst": extraire_ip(d["dst"]),
-                    "length": d["length"]
-                })
-    return trames
+                hms, frac, src, dst, length, proto = m.group("time", "frac", "src", "dst", "length", "proto")
+                proto = PROTOS.get(proto, "ip")
+                if proto in AVEC_PORT:
+                    src, src_port = separer(src)
+                    dst, dst_port = separer(dst)
+                else:  # ICMP, GRE, ... : 192.168.1.10 reste entier
+                    src_port = dst_port = ""
+                nb += 1
+                yield {
+                    "time": hms,
+                    "us": microsecondes(hms, frac),
+                    "src": src,
+                    "dst": dst,
+                    "length": length,
+                    "src_port": src_port,
+                    "dst_port": dst_port,
+                    "proto": proto
+                }
+    finally:  # compteurs reportés une fois, aussi quand le flux est interrompu
+        STATS_HORODATAGE["trames"] += nb
+        STATS_HORODATAGE["conversions"] += horloge.conversions - conversions
+
+# ---------------- champs TCP complets (flags, seq, ack, win) en une seule regex précompilée
+pattern_tcp = re.compile(
+    r'(?P<time>\d{2}:\d{2}:\d{2})\.(?P<frac>\d+)\s+IP\s+'
+    r'(?P<src>[^ ]+)\s+>\s+(?P<dst>[^:]+):\s+Flags\s+\[(?P<flags>[^\]]*)\]'
+    r'(?:,\s+seq\s+(?P<seq>\d+)(?::(?P<seq_fin>\d+))?)?'
+    r'(?:,\s+ack\s+(?P<ack>\d+))?'
+    r'(?:,\s+win\s+(?P<win>\d+))?'
+    r'.*length\s+(?P<length>\d+)'
+)
+
+# lettres de tcpdump -> bits de l'en-tête TCP ("." = ACK, "none" = aucun)
+TCP_FIN, TCP_SYN, TCP_RST, TCP_PSH, TCP_ACK, TCP_URG, TCP_ECE, TCP_CWR = (1 << i for i in range(8))
+DRAPEAUX_TCP = {"F": TCP_FIN, "S": TCP_SYN, "R": TCP_RST, "P": TCP_PSH,
+                ".": TCP_ACK, "U": TCP_URG, "E": TCP_ECE, "W": TCP_CWR}
+
+@lru_cache(maxsize=256)  # quelques dizaines de combinaisons au plus
+def masque_drapeaux(texte):
+    masque = 0
+    for lettre in texte:
+        masque |= DRAPEAUX_TCP.get(lettre, 0)
+    return masque
+
+def texte_drapeaux(masque):  # opération inverse, pour l'affichage
+    return "".join(lettre for lettre, bit in DRAPEAUX_TCP.items() if masque & bit) or "none"
+
+class TrameTCP(dict):
+    # trame (dict) dont seq / seq_fin / ack / win / flags ne sont convertis en int
+    # qu'au premier accès : une analyse qui ne lit que src / dst ne paie pas les int()
+    __slots__ = ("m",)
+    CONVERSIONS = {"seq": int, "seq_fin": int, "ack": int, "win": int, "flags": masque_drapeaux}
+
+    def __missing__(self, cle):
+        conversion = self.CONVERSIONS.get(cle)
+        if conversion is None:
+            raise KeyError(cle)
+        texte = self.m[cle]
+        valeur = conversion(texte) if texte is not None else None  # seq / ack / win absents (SYN, RST)
+        self[cle] = valeur
+        return valeur
+
+def iterer_trames_tcp(lignes):
+    # même contrat que iterer_trames_lignes, limité aux segments TCP (ligne avec Flags [...])
+    chercher = pattern_tcp.search
+    extraire = extraire_ip_cache
+    microsecondes = Horloge().microsecondes
+    for ligne in lignes:
+        if ligne_hexa(ligne):
+            continue
+        m = chercher(ligne)
+        if m:
+            t = TrameTCP(
+                time=m["time"],
+                us=microsecondes(m["time"], m["frac"]),
+                src=extraire(m["src"]),
+                dst=extraire(m["dst"]),
+                length=m["length"],
+            )
+            t.m = m
+            yield t
+
+# ---------------- analyse multi-protocole : le jeton qui suit l'horodatage (IP, IP6, ARP,)
+# choisit l'extracteur, chaque ligne n'est découpée qu'une fois et aucune n'est ignorée en silence
+# sans port (ICMP, GRE, ... : PROTOCOLES_SANS_PORT) l'adresse est gardée telle quelle, pas de extraire_ip
+
+def longueur_suite(suite):
+    # dernier "length N" (comme la regex), sinon "(N)" final des décodeurs DNS / NTP ...
+    avant, trouve, apres = suite.rpartition("length ")
+    if trouve:
+        chiffres = apres[:len(apres) - len(apres.lstrip("0123456789"))]  # "120: HTTP" -> "120"
+        if chiffres:
+            return chiffres
+    if suite.endswith(")"):
+        chiffres = suite[suite.rfind("(") + 1:-1]
+        if chiffres.isdecimal():
+            return chiffres
+    return None
+
+def sans_port_ip6(champ):  # fe80::1.546 -> fe80::1
+    debut, point, fin = champ.rpartition(".")
+    return debut if point else champ
+
+def extraire_ligne_ip(reste, famille):
+    src, fleche, suite = reste.partition(" > ")
+    dst, separateur, suite = suite.partition(": ")
+    if not fleche or not separateur:
+        return None  # tcpdump -v : l'entête IP est sur cette ligne, les adresses sur la suivante
+    if suite.startswith("Flags ["):
+        proto = "tcp"
+    elif suite.startswith("ICMP"):
+        proto = "icmp"
+    elif suite.startswith("sctp"):
+        proto = "sctp"
+    elif suite.startswith("UDP") or not suite.lower().startswith(PROTOCOLES_SANS_PORT):
+        proto = "udp"  # décodeur applicatif (DNS, NTP, dhcp6, ...) : toujours sur UDP ici, TCP a ses Flags
+    else:
+        proto = "ip"
+    if proto in AVEC_PORT:
+        if famille == "IP":
+            src, dst = extraire_ip_cache(src), extraire_ip_cache(dst)
+        else:
+            src, dst = sans_port_ip6(src), sans_port_ip6(dst)
+    t = {"proto": proto, "src": src, "dst": dst, "length": longueur_suite(suite)}
+    if proto == "tcp":
+        t["flags"] = masque_drapeaux(suite[7:suite.find("]")])
+    elif proto == "icmp":
+        t["icmp"] = suite.partition(" ")[2].lstrip(", ").partition(",")[0]  # echo request, ...
+    return t
+
+def extraire_ligne_arp(reste, famille):
+    # Request who-has 10.0.0.1 tell 10.0.0.2, length 28 / Reply 10.0.0.1 is-at 00:11:22:33:44:55, length 28
+    mots = reste.split()
+    if len(mots) < 3:
+        return None
+    op = mots[0].lower()
+    if op == "request" and "tell" in mots:
+        src, dst = mots[mots.index("tell") + 1].rstrip(","), mots[2]
+    elif op == "reply":
+        src, dst = mots[1], ""  # la réponse ne nomme pas le demandeur
+    else:
+        return None
+    return {"proto": "arp", "src": src, "dst": dst, "length": longueur_suite(reste), "op": op}
+
+EXTRACTEURS_PROTOCOLE = {
+    "IP": extraire_ligne_ip,
+    "IP6": extraire_ligne_ip,
+    "ARP,": extraire_ligne_arp,
+}
+
+def iterer_trames_protocoles(lignes, compteurs=None):
+    # compteurs (Counter) : "IP/tcp", "IP6/udp", "ARP/arp", ... et jetons inconnus tels quels
+    compteurs = Counter() if compteurs is None else compteurs
+    microsecondes = Horloge().microsecondes
+    extracteurs = EXTRACTEURS_PROTOCOLE
+    for ligne in lignes:
+        if not "0" <= ligne[:1] <= "9":  # hexa, suite de ligne -v, ...
+            continue
+        champs = ligne.split(None, 2)
+        if len(champs) < 3 or ligne[8:9] != ".":
+            continue
+        horodatage, jeton, reste = champs
+        extracteur = extracteurs.get(jeton)
+        t = extracteur(reste.rstrip("\r\n"), jeton) if extracteur else None
+        if t is None:
+            compteurs[jeton.rstrip(",") if extracteur is None else jeton.rstrip(",") + "/non décodé"] += 1
+            continue
+        compteurs[jeton.rstrip(",") + "/" + t["proto"]] += 1
+        t["time"] = horodatage[:8]
+        t["us"] = microsecondes(horodatage[:8], horodatage[9:])
+        yield t
+
+# ---------------- fichiers compressés (.gz / .bz2 / .xz), reconnus à leurs premiers octets
+COMPRESSIONS = (
+    (b"\x1f\x8b", gzip),
+    (b"BZh", bz2),
+    (b"\xfd7zXZ\x00", lzma),
+)
+TAILLE_BLOC = 1 << 20        # octets décompressés par lecture
+BLOCS_EN_AVANCE = 4          # blocs d'avance du thread de décompression (mémoire bornée)
+DECOMPRESSION_EN_THREAD = True
+
+def detecter_compression(chemin):
+    with open(chemin, "rb") as f:
+        debut = f.read(6)
+    for magic, module in COMPRESSIONS:
+        if debut.startswith(magic):
+            return module
+    return None
+
+# fichier binaire, décompressé au vol s'il le faut : sert à lire le magic d'un .pcap.gz
+def ouvrir_capture(chemin):
+    module = detecter_compression(chemin)
+    return open(chemin, "rb") if module is None else module.open(chemin, "rb")
+
+def lire_blocs(flux, taille_bloc=TAILLE_BLOC):
+    while True:
+        bloc = flux.read(taille_bloc)
+        if not bloc:
+            return
+        yield bloc
+
+# décompression sur un thread (zlib / bz2 / lzma relâchent le GIL) pendant que l'analyse continue
+def lire_blocs_thread(flux, taille_bloc=TAILLE_BLOC, profondeur=BLOCS_EN_AVANCE):
+    file = queue.Queue(maxsize=profondeur)
+    arret = threading.Event()
+
+    # blocs, fin (None) et erreur passent tous par ici : jamais bloqué si le lecteur s'arrête
+    # avec la file pleine (break, Ctrl+C, erreur d'un puits)
+    def deposer(element):
+        while not arret.is_set():
+            try:
+                file.put(element, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def producteur():
+        try:
+            for bloc in lire_blocs(flux, taille_bloc):
+                if not deposer(bloc):
+                    return
+            deposer(None)
+        except Exception as e:  # remontée de l'erreur au lecteur (fichier corrompu, ...)
+            deposer(e)
+
+    thread = threading.Thread(target=producteur, daemon=True)
+    thread.start()
+    try:
+        while True:
+            bloc = file.get()
+            if bloc is None:
+                return
+            if isinstance(bloc, Exception):
+                raise bloc
+            yield bloc
+    finally:
+        arret.set()
+        thread.join()
+
+# blocs d'octets -> lignes complètes (un caractère UTF-8 ou une ligne peuvent être coupés entre deux blocs)
+class LignesIncrementales:
+    def __init__(self):
+        self.decodeur = codecs.getincrementaldecoder("utf-8")()
+        self.reste = ""
+
+    def decouper(self, bloc):
+        lignes = (self.reste + self.decodeur.decode(bloc)).split("\n")
+        self.reste = lignes.pop()  # dernière ligne pas encore terminée par \n
+        return lignes
+
+    def finir(self):
+        reste = self.reste + self.decodeur.decode(b"", final=True)
+        self.reinitialiser()
+        return [reste] if reste else []
+
+    def reinitialiser(self):
+        self.decodeur.reset()
+        self.reste = ""
+
+def lignes_depuis_blocs(blocs):
+    lignes = LignesIncrementales()
+    for bloc in blocs:
+        for ligne in lignes.decouper(bloc):
+            yield ligne + "\n"
+    yield from lignes.finir()
+
+def iterer_trames_compresse(chemin, module, thread=None, extracteur=iterer_trames_lignes):
+    if thread is None:
+        thread = DECOMPRESSION_EN_THREAD
+    with module.open(chemin, "rb") as flux:
+        blocs = lire_blocs_thread(flux) if thread else lire_blocs(flux)
+        yield from extracteur(lignes_depuis_blocs(blocs))
+
+# ---------------- lecture fichier (flux : une trame à la fois, mémoire constante)
+# extracteur=iterer_trames_tcp pour avoir aussi flags / seq / ack / win
+def iterer_trames(chemin, extracteur=iterer_trames_lignes):
+    module = detecter_compression(chemin)
+    if module is not None:
+        yield from iterer_trames_compresse(chemin, module, extracteur=extracteur)
+        return
+    with open(chemin, "r", encoding="utf-8") as f:
+        yield from extracteur(f)
+
+# ---------------- lecture mmap : regex en octets sur le fichier projeté, sans copie
+# mais pas plus rapide que le lecteur texte : option, jamais choisie par auto
+def iterer_trames_octets(buf, debut=0, fin=None):
+    fin = len(buf) if fin is None else fin
+    chercher = pattern_octets.search
+    trouver = buf.find
+    separer = separer_ip_port_cache
+    horloge = Horloge()
+    microsecondes = horloge.microsecondes
+    time_prec = time_str = None
+    nb = 0
+    position = debut
+    try:
+        while position < fin:
+            m = chercher(buf, position, fin)
+            if not m:
+                break
+            time_b, frac_b, src_b, dst_b, length_b, proto_b = m.group("time", "frac", "src", "dst", "length", "proto")
+            if time_b != time_prec:  # même seconde : chaîne déjà décodée
+                time_prec, time_str = time_b, time_b.decode("ascii")
+            proto = PROTOS_OCTETS.get(proto_b, "ip")
+            if proto in AVEC_PORT:
+                src, src_port = separer(src_b.decode("utf-8"))
+                dst, dst_port = separer(dst_b.decode("utf-8"))
+            else:
+                src, dst = src_b.decode("utf-8"), dst_b.decode("utf-8")
+                src_port = dst_port = ""
+            nb += 1
+            yield {
+                "time": time_str,
+                "us": microsecondes(time_b, frac_b),
+                "src": src,
+                "dst": dst,
+                "length": length_b.decode("ascii"),
+                "src_port": src_port,
+                "dst_port": dst_port,
+                "proto": proto
+            }
+            position = trouver(b"\n", m.end(), fin) + 1  # une seule trame par ligne
+            if position == 0:
+                break
+    finally:
+        STATS_HORODATAGE["trames"] += nb
+        STATS_HORODATAGE["conversions"] += horloge.conversions
+
+def iterer_trames_mmap(chemin, debut=0, fin=None):
+    with open(chemin, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:  # mmap refuse un fichier vide
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield from iterer_trames_octets(buf, debut, fin)
+
+# ---------------- lecture pcap (libpcap binaire, sans passer par tcpdump -r)
+# magic -> (boutisme, unités de timestamp par seconde)
+PCAP_MAGIC = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1000000),
+    b"\xa1\xb2\xc3\xd4": (">", 1000000),
+    b"\x4d\x3c\xb2\xa1": ("<", 1000000000),
+    b"\xa1\xb2\x3c\x4d": (">", 1000000000),
+}
+
+# type de lien -> fonction donnant (ethertype, début de l'entête IP)
+def lien_ethernet(paquet):
+    ethertype, = struct.unpack_from("!H", paquet, 12)
+    debut = 14
+    while ethertype in (0x8100, 0x88A8) and len(paquet) >= debut + 4:  # VLAN 802.1Q / QinQ
+        ethertype, = struct.unpack_from("!H", paquet, debut + 2)
+        debut += 4
+    return ethertype, debut
+
+def lien_brut(paquet):
+    version = paquet[0] >> 4 if len(paquet) else 0
+    return (0x0800 if version == 4 else 0x86DD if version == 6 else 0), 0
+
+def lien_null(paquet):  # loopback BSD : famille d'adresse sur 4 octets (boutisme de la machine)
+    famille = paquet[0] or paquet[3]
+    return (0x0800 if famille == 2 else 0x86DD if famille in (10, 24, 28, 30) else 0), 4
+
+def lien_sll(paquet):
+    ethertype, = struct.unpack_from("!H", paquet, 14)
+    return ethertype, 16
+
+def lien_sll2(paquet):
+    ethertype, = struct.unpack_from("!H", paquet, 0)
+    return ethertype, 20
+
+LIENS_PCAP = {
+    0: lien_null,
+    1: lien_ethernet,
+    12: lien_brut,
+    101: lien_brut,
+    113: lien_sll,
+    276: lien_sll2,
+}
+
+ENTETES_EXTENSION_IP6 = (0, 43, 60)  # hop-by-hop, routage, options destination
+PROTOS_IP = {1: "icmp", 6: "tcp", 17: "udp", 58: "icmp", 132: "sctp"}  # numéro de protocole -> nom des lecteurs texte
+
+# ---------------- décodage IPv4 / IPv6 puis TCP / UDP / SCTP :
+# (src, dst, length, proto, port src, port dst) comme tcpdump -n, ports "" hors AVEC_PORT
+def decoder_ip(paquet, debut):
+    if len(paquet) < debut + 20:
+        return None
+    version = paquet[debut] >> 4
+    if version == 4:
+        ihl = (paquet[debut] & 0x0F) * 4
+        longueur_totale, fragment = struct.unpack_from("!H2xH", paquet, debut + 2)
+        proto = paquet[debut + 9]
+        src = socket.inet_ntop(socket.AF_INET, bytes(paquet[debut + 12:debut + 16]))
+        dst = socket.inet_ntop(socket.AF_INET, bytes(paquet[debut + 16:debut + 20]))
+        charge = longueur_totale - ihl
+        l4 = debut + ihl
+        if fragment & 0x1FFF:  # fragment suivant : pas d'entête TCP/UDP (ip-proto-N pour tcpdump)
+            return src, dst, charge, "ip", "", ""
+    elif version == 6:
+        if len(paquet) < debut + 40:
+            return None
+        charge, proto = struct.unpack_from("!HB", paquet, debut + 4)
+        src = socket.inet_ntop(socket.AF_INET6, bytes(paquet[debut + 8:debut + 24]))
+        dst = socket.inet_ntop(socket.AF_INET6, bytes(paquet[debut + 24:debut + 40]))
+        l4 = debut + 40
+        while proto in ENTETES_EXTENSION_IP6 and len(paquet) >= l4 + 8:
+            taille = (paquet[l4 + 1] + 1) * 8
+            proto = paquet[l4]
+            charge -= taille
+            l4 += taille
+        if proto == 44 and len(paquet) >= l4 + 8:  # entête fragment IPv6
+            charge -= 8
+            if struct.unpack_from("!H", paquet, l4 + 2)[0] & 0xFFF8:
+                return src, dst, charge, "ip", "", ""
+            proto = paquet[l4]
+            l4 += 8
+    else:
+        return None
+
+    nom = PROTOS_IP.get(proto, "ip")
+    if nom not in AVEC_PORT or len(paquet) < l4 + 4:  # ICMP, GRE, ... ou entête tronqué (snaplen)
+        return src, dst, charge, nom, "", ""
+    src_port, dst_port = struct.unpack_from("!HH", paquet, l4)  # mêmes 4 premiers octets en TCP / UDP / SCTP
+    if proto == 6 and len(paquet) >= l4 + 13:  # TCP : length = données après l'entête
+        charge -= (paquet[l4 + 12] >> 4) * 4
+    elif proto == 17 and len(paquet) >= l4 + 6:  # UDP : length = longueur UDP - 8
+        charge = struct.unpack_from("!H", paquet, l4 + 4)[0] - 8
+    return src, dst, charge, nom, str(src_port), str(dst_port)
+
+def decoder_paquet(lien, paquet):
+    try:
+        ethertype, debut = lien(paquet)
+    except (struct.error, IndexError):
+        return None
+    if ethertype not in (0x0800, 0x86DD):
+        return None
+    try:
+        return decoder_ip(paquet, debut)
+    except (struct.error, IndexError, ValueError):
+        return None
+
+# heure locale "HH:MM:SS" comme l'affichage par défaut de tcpdump
+def heure_locale(secondes):
+    return time.strftime("%H:%M:%S", time.localtime(secondes))
+
+# capture binaire compressée (.pcap.gz, ...) : décompressée dans un fichier temporaire
+# puis projetée comme les autres, la mémoire reste bornée
+def decompresser_temporaire(chemin, module):
+    temporaire = tempfile.TemporaryFile()
+    with module.open(chemin, "rb") as flux:
+        shutil.copyfileobj(flux, temporaire, TAILLE_BLOC)
+    temporaire.flush()
+    return temporaire
+
+# fichier projeté en mémoire, parcouru par une fonction de décodage via un memoryview (zéro copie)
+def iterer_vue_fichier(chemin, iterer_vue):
+    module = detecter_compression(chemin)
+    with open(chemin, "rb") if module is None else decompresser_temporaire(chemin, module) as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            vue = memoryview(buf)
+            try:
+                yield from iterer_vue(vue)
+            finally:
+                vue.release()
+
+def iterer_trames_pcap(chemin):
+    return iterer_vue_fichier(chemin, iterer_trames_pcap_vue)
+
+def iterer_trames_pcap_vue(vue):
+    if len(vue) < 24:
+        return
+    if bytes(vue[0:4]) not in PCAP_MAGIC:
+        raise ValueError("fichier pcap invalide (magic inconnu)")
+    boutisme, unites = PCAP_MAGIC[bytes(vue[0:4])]
+    type_lien, = struct.unpack_from(boutisme + "I", vue, 20)
+    lien = LIENS_PCAP.get(type_lien & 0x0FFFFFFF)
+    if lien is None:
+        raise ValueError(f"type de lien pcap non géré : {type_lien}")
+
+    entete = struct.Struct(boutisme + "IIII")
+    position = 24
+    taille = len(vue)
+    microsecondes = HorlogeEpoque().microsecondes
+    derniere_seconde, derniere_heure = None, None
+    while position + 16 <= taille:
+        secondes, fraction, capture, origine = entete.unpack_from(vue, position)
+        position += 16
+        paquet = vue[position:position + capture]  # pas de copie
+        position += capture
+        resultat = decoder_paquet(lien, paquet)
+        paquet.release()
+        if resultat is None:
+            continue
+        if secondes != derniere_seconde:  # une conversion d'heure par seconde de capture
+            derniere_seconde, derniere_heure = secondes, heure_locale(secondes)
+        src, dst, longueur, proto, src_port, dst_port = resultat
+        yield {
+            "time": derniere_heure,
+            "us": microsecondes(secondes * 1000000 + fraction * 1000000 // unites),
+            "src": src,
+            "dst": dst,
+            "length": str(longueur),
+            "src_port": src_port,
+            "dst_port": dst_port,
+            "proto": proto
+        }
+
+# ---------------- lecture pcapng (blocs SHB / IDB / EPB, résolution propre à chaque interface)
+PCAPNG_SHB = 0x0A0D0D0A
+PCAPNG_IDB = 1
+PCAPNG_EPB = 6
+PCAPNG_BOUTISME = {
+    b"\x4d\x3c\x2b\x1a": "<",
+    b"\x1a\x2b\x3c\x4d": ">",
+}
+OPTION_FIN = 0
+OPTION_IF_NAME = 2
+OPTION_IF_TSRESOL = 9
+OPTION_IF_TSOFFSET = 14
+
+def options_pcapng(vue, debut, fin, boutisme):
+    options = {}
+    while debut + 4 <= fin:
+        code, longueur = struct.unpack_from(boutisme + "HH", vue, debut)
+        if code == OPTION_FIN:
+            break
+        options[code] = bytes(vue[debut + 4:debut + 4 + longueur])
+        debut += 4 + (longueur + 3) // 4 * 4  # valeurs alignées sur 32 bits
+    return options
+
+def unites_pcapng(tsresol):  # if_tsresol -> unités de timestamp par seconde
+    if tsresol & 0x80:
+        return 2 ** (tsresol & 0x7F)
+    return 10 ** tsresol
+
+def iterer_trames_pcapng(chemin):
+    return iterer_vue_fichier(chemin, iterer_trames_pcapng_vue)
+
+def iterer_trames_pcapng_vue(vue):
+    position = 0
+    taille = len(vue)
+    boutisme = "<"
+    interfaces = []  # (lien, unités par seconde, décalage en secondes, nom)
+    microsecondes = HorlogeEpoque().microsecondes
+    derniere_seconde, derniere_heure = None, None
+    while position + 12 <= taille:
+        if struct.unpack_from("<I", vue, position)[0] == PCAPNG_SHB:  # même valeur dans les deux boutismes
+            magic = bytes(vue[position + 8:position + 12])
+            if magic not in PCAPNG_BOUTISME:
+                raise ValueError("fichier pcapng invalide (byte-order magic inconnu)")
+            boutisme = PCAPNG_BOUTISME[magic]
+            interfaces = []  # chaque section a ses propres interfaces
+        type_bloc, longueur = struct.unpack_from(boutisme + "II", vue, position)
+        if longueur < 12 or position + longueur > taille:  # bloc tronqué (capture en cours)
+            break
+        corps = position + 8
+        fin = position + longueur - 4
+
+        if type_bloc == PCAPNG_IDB:
+            type_lien, = struct.unpack_from(boutisme + "H", vue, corps)
+            options = options_pcapng(vue, corps + 8, fin, boutisme)
+            unites = unites_pcapng(options[OPTION_IF_TSRESOL][0]) if OPTION_IF_TSRESOL in options else 1000000
+            decalage = struct.unpack(boutisme + "q", options[OPTION_IF_TSOFFSET])[0] if OPTION_IF_TSOFFSET in options else 0
+            if OPTION_IF_NAME in options:
+                nom = options[OPTION_IF_NAME].rstrip(b"\0").decode("utf-8", "replace")
+            else:
+                nom = f"if{len(interfaces)}"
+            interfaces.append((LIENS_PCAP.get(type_lien), unites, decalage, nom))
+
+        elif type_bloc == PCAPNG_EPB:
+            numero, haut, bas, capture = struct.unpack_from(boutisme + "IIII", vue, corps)
+            # interface jamais déclarée (fichier corrompu) : bloc ignoré, comme un lien non géré
+            lien, unites, decalage, nom = interfaces[numero] if numero < len(interfaces) else (None, 1, 0, "")
+            if lien is not None:
+                paquet = vue[corps + 20:corps + 20 + capture]  # pas de copie
+                resultat = decoder_paquet(lien, paquet)
+                paquet.release()
+                if resultat is not None:
+                    horodatage = (haut << 32) | bas
+                    secondes = horodatage // unites + decalage
+                    if secondes != derniere_seconde:
+                        derniere_seconde, derniere_heure = secondes, heure_locale(secondes)
+                    src, dst, longueur_trame, proto, src_port, dst_port = resultat
+                    yield {
+                        "time": derniere_heure,
+                        "us": microsecondes(horodatage * 1000000 // unites + decalage * 1000000),
+                        "src": src,
+                        "dst": dst,
+                        "length": str(longueur_trame),
+                        "src_port": src_port,
+                        "dst_port": dst_port,
+                        "proto": proto,
+                        "interface": nom
+                    }
+
+        position += longueur
+
+def detecter_lecteur(chemin):  # magic du contenu, après décompression éventuelle
+    with ouvrir_capture(chemin) as f:
+        magic = f.read(4)
+    if magic in PCAP_MAGIC:
+        return "pcap"
+    if magic == struct.pack("<I", PCAPNG_SHB):
+        return "pcapng"
+    return "texte"
+
+LECTEURS = {
+    "texte": iterer_trames,
+    "mmap": iterer_trames_mmap,
+    "pcap": iterer_trames_pcap,
+    "pcapng": iterer_trames_pcapng,
+}
+
+# ---------------- table des hôtes : chaque nom normalisé reçoit un numéro une seule fois
+class TableHotes:
+    def __init__(self):
+        self.noms = []
+        self.index = {}
+        self.noms_csv = {}
+
+    def id(self, nom):
+        i = self.index.get(nom)
+        if i is None:
+            i = self.index[nom] = len(self.noms)
+            self.noms.append(nom)
+        return i
+
+    def __getitem__(self, i):
+        return self.noms[i]
+
+    def __len__(self):
+        return len(self.noms)
+
+    def nom_csv(self, i):
+        nom = self.noms_csv.get(i)
+        if nom is None:  # normaliser_texte une seule fois par hôte
+            nom = self.noms_csv[i] = normaliser_texte(self.noms[i])
+        return nom
+
+    def traduire(self, compteur_ids):
+        # numéros -> noms, l'ordre d'apparition (égalités de most_common) est conservé
+        noms = self.noms
+        return Counter({noms[i]: nb for i, nb in compteur_ids.items()})
+
+# numérotation des hôtes dans le flux : les puits travaillent ensuite sur src_id / dst_id
+def numeroter_hotes(trames, hotes):
+    id_hote = hotes.id
+    for t in trames:
+        t["src_id"] = id_hote(t["src"])
+        t["dst_id"] = id_hote(t["dst"])
+        yield t
+
+# ---------------- stockage en colonnes (tableaux typés au lieu d'un dict par trame)
+def format_hms(us):
+    secondes = us // 1000000 % 86400
+    return f"{secondes // 3600:02d}:{secondes // 60 % 60:02d}:{secondes % 60:02d}"
+
+class TableTrames:
+    # 20 octets par trame : us int64 (µs depuis minuit du 1er jour), length uint32,
+    # src / dst uint32 = numéro de l'hôte dans self.hotes (TableHotes)
+    def __init__(self, hotes=None):
+        self.us = array("q")
+        self.length = array("I")
+        self.src = array("I")
+        self.dst = array("I")
+        self.hotes = hotes if hotes is not None else TableHotes()
+        self.horloge = Horloge()  # trames sans "us" : déduit de "time"
+
+    # la table est aussi un puits du mode flux
+    def ajouter(self, t):
+        us = t.get("us")
+        self.us.append(us if us is not None else self.horloge.microsecondes(t["time"], "0"))
+        self.length.append(int(t["length"]))
+        self.src.append(self.hotes.id(t["src"]))
+        self.dst.append(self.hotes.id(t["dst"]))
+
+    def fermer(self):
+        pass
+
+    def __len__(self):
+        return len(self.us)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            morceau = TableTrames(self.hotes)  # table des hôtes partagée
+            morceau.us = self.us[i]
+            morceau.length = self.length[i]
+            morceau.src = self.src[i]
+            morceau.dst = self.dst[i]
+            return morceau
+        return {
+            "time": format_hms(self.us[i]),
+            "us": self.us[i],
+            "src": self.hotes[self.src[i]],
+            "dst": self.hotes[self.dst[i]],
+            "length": str(self.length[i])
+        }
+
+    def __iter__(self):
+        hotes = self.hotes.noms
+        for us, longueur, s, d in zip(self.us, self.length, self.src, self.dst):
+            yield {
+                "time": format_hms(us),
+                "us": us,
+                "src": hotes[s],
+                "dst": hotes[d],
+                "length": str(longueur)
+            }
+
+    def en_dicts(self):
+        return list(self)
+
+    def compter(self, colonne="src"):
+        return self.hotes.traduire(Counter(getattr(self, colonne)))
+
+    def compter_tranches(self, pas_us=1000000):
+        # trames par tranche de pas_us (1 s par défaut, moins pour un débit fin) : division entière
+        return Counter(us // pas_us for us in self.us)
+
+    def trier(self):
+        # ordre chronologique sur l'entier us (stable : l'ordre du fichier départage les égalités)
+        ordre = sorted(range(len(self)), key=self.us.__getitem__)
+        triee = TableTrames(self.hotes)
+        for colonne in ("us", "length", "src", "dst"):
+            valeurs = getattr(self, colonne)
+            setattr(triee, colonne, array(valeurs.typecode, (valeurs[i] for i in ordre)))
+        return triee
+
+    def lignes_csv(self):
+        nom_csv = self.hotes.nom_csv
+        for us, longueur, s, d in zip(self.us, self.length, self.src, self.dst):
+            yield (format_hms(us), nom_csv(s), nom_csv(d), str(longueur))
+
+# ---------------- lecture fichier (table complète en colonnes)
+def lire_fichier(chemin, lecteur="texte"):
+    table = TableTrames()
+    for t in LECTEURS[lecteur](chemin):
+        table.ajouter(t)
+    return table
+
+# ---------------- cache des trames déjà analysées (.cache_trames/<sha1>-<lecteur>.trames)
+DOSSIER_CACHE = ".cache_trames"
+MAGIC_CACHE = b"SAETRAME"
+VERSION_CACHE = 5  # à changer si l'extraction (pattern, extraire_ip, ...) change
+ENTETE_CACHE = struct.Struct("<8sHBxIII")  # magic, version, petit boutiste, trames, hôtes, octets des noms
+
+def empreinte_contenu(chemin):
+    h = hashlib.sha1()
+    with open(chemin, "rb") as f:
+        for bloc in lire_blocs(f):
+            h.update(bloc)
+    return h.hexdigest()
+
+def chemin_index_cache():
+    return os.path.join(DOSSIER_CACHE, "index.json")
+
+def lire_index_cache():
+    try:
+        with open(chemin_index_cache(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def cle_cache(chemin, lecteur):
+    # taille + mtime inchangés : l'empreinte déjà calculée est reprise, sinon on relit le contenu
+    stat = os.stat(chemin)
+    absolu = os.path.abspath(chemin)
+    index = lire_index_cache()
+    entree = index.get(absolu)
+    if entree and entree[0] == stat.st_size and entree[1] == stat.st_mtime_ns:
+        empreinte = entree[2]
+    else:
+        empreinte = empreinte_contenu(chemin)
+        os.makedirs(DOSSIER_CACHE, exist_ok=True)
+        if entree and entree[2] != empreinte and not any(
+                e[2] == entree[2] for c, e in index.items() if c != absolu):
+            for nom in os.listdir(DOSSIER_CACHE):  # contenu modifié : l'ancien cache ne sert plus
+                if nom.startswith(entree[2] + "-"):
+                    os.remove(os.path.join(DOSSIER_CACHE, nom))
+        index[absolu] = [stat.st_size, stat.st_mtime_ns, empreinte]
+        temporaire = chemin_index_cache() + ".tmp"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(temporaire, chemin_index_cache())
+    if lecteur in ("pcap", "pcapng"):  # heure locale calculée à la lecture
+        lecteur += "-" + "-".join(time.tzname)
+    return f"{empreinte}-{lecteur}"
+
+def ecrire_cache(table, chemin_cache):
+    noms = "\n".join(table.hotes.noms).encode("utf-8")
+    temporaire = chemin_cache + ".tmp"
+    with open(temporaire, "wb") as f:
+        f.write(ENTETE_CACHE.pack(MAGIC_CACHE, VERSION_CACHE, sys.byteorder == "little",
+                                  len(table), len(table.hotes), len(noms)))
+        f.write(noms)
+        for colonne in (table.us, table.length, table.src, table.dst):
+            colonne.tofile(f)
+    os.replace(temporaire, chemin_cache)
+
+def lire_cache(chemin_cache):
+    with open(chemin_cache, "rb") as f:
+        magic, version, petit, nb_trames, nb_hotes, taille_noms = ENTETE_CACHE.unpack(f.read(ENTETE_CACHE.size))
+        if magic != MAGIC_CACHE or version != VERSION_CACHE:
+            return None
+        table = TableTrames()
+        for nom in (f.read(taille_noms).decode("utf-8").split("\n") if nb_hotes else []):
+            table.hotes.id(nom)
+        for colonne in (table.us, table.length, table.src, table.dst):
+            colonne.fromfile(f, nb_trames)
+            if petit != (sys.byteorder == "little"):
+                colonne.byteswap()
+    return table
+
+def lire_fichier_cache(chemin, lecteur="texte"):
+    famille = "texte" if lecteur == "mmap" else lecteur  # même résultat pour les deux lecteurs texte
+    chemin_cache = os.path.join(DOSSIER_CACHE, cle_cache(chemin, famille) + ".trames")
+    try:
+        table = lire_cache(chemin_cache)
+        if table is not None:
+            return table
+    except (OSError, ValueError, EOFError, struct.error):
+        pass  # absent ou abîmé : on relit la capture
+    table = lire_fichier(chemin, lecteur)
+    ecrire_cache(table, chemin_cache)
+    return table
 
 # ---------------- sauvegarde CSV
+CHAMPS_CSV = ["time", "src", "dst", "length"]
+
+# lignes en tuples dans l'ordre de CHAMPS_CSV : csv.writer évite la conversion dict -> liste de DictWriter
+def ligne_csv(t):
+    return (t["time"], normaliser_texte_cache(t["src"]), normaliser_texte_cache(t["dst"]), t["length"])
+
+def ligne_csv_ids(t, hotes):
+    return (t["time"], hotes.nom_csv(t["src_id"]), hotes.nom_csv(t["dst_id"]), t["length"])
+
 def sauvegarder_csv(trames, chemin_csv="trames.csv"):
-    champs = ["time", "src", "dst", "length"]
     with open(chemin_csv, mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=champs)
-        writer.writeheader()
-        for t in trames:
-            writer.writerow({
-                "time": t["time"],
-                "src": normaliser_texte(t["src"]),
-                "dst": normaliser_texte(t["dst"]),
-                "length": t["length"]
-            })
+        writer = csv.writer(f)
+        writer.writerow(CHAMPS_CSV)
+        if isinstance(trames, TableTrames):
+            writer.writerows(trames.lignes_csv())
+        else:
+            writer.writerows(map(ligne_csv, trames))
     print(f"CSV créé : {chemin_csv}")
 
+# ---------------- puits du mode flux (chaque trame est poussée dans chaque puits)
+# avec une TableHotes, les puits attendent des trames passées par numeroter_hotes
+class PuitsCSV:
+    TAILLE_LOT = 4096  # lignes écrites d'un coup par writerows
+
+    def __init__(self, chemin_csv="trames.csv", hotes=None, taille_reprise=0):
+        self.chemin_csv = chemin_csv
+        self.hotes = hotes
+        self.taille_reprise = taille_reprise  # > 0 : on complète un CSV déjà écrit jusqu'à cette taille
+        self.f = None
+        self.writer = None
+        self.lot = []
+        if taille_reprise:  # tout de suite, même sans nouvelle trame : lignes écrites après le point de reprise
+            os.truncate(chemin_csv, taille_reprise)
+
+    def ouvrir(self):
+        if self.taille_reprise:
+            self.f = open(self.chemin_csv, mode="a", newline="", encoding="utf-8")
+            self.writer = csv.writer(self.f)
+        else:
+            self.f = open(self.chemin_csv, mode="w", newline="", encoding="utf-8")
+            self.writer = csv.writer(self.f)
+            self.writer.writerow(CHAMPS_CSV)
+
+    def vider(self):  # écrit le lot en cours, rend la taille du CSV
+        if self.f is None:
+            return self.taille_reprise
+        self.writer.writerows(self.lot)
+        self.lot.clear()
+        self.f.flush()
+        return self.f.tell()
+
+    def ajouter(self, t):
+        if self.f is None:  # ouverture à la première trame : pas de CSV vide
+            self.ouvrir()
+        if self.hotes is not None:
+            self.lot.append(ligne_csv_ids(t, self.hotes))
+        else:
+            self.lot.append(ligne_csv(t))
+        if len(self.lot) >= self.TAILLE_LOT:
+            self.writer.writerows(self.lot)
+            self.lot.clear()
+
+    def fermer(self):
+        if self.f is not None:
+            self.writer.writerows(self.lot)
+            self.lot.clear()
+            self.f.close()
+            print(f"CSV créé : {self.chemin_csv}")
+
+class PuitsCompteur:
+    def __init__(self, champ="src", hotes=None):
+        self.champ = champ
+        self.hotes = hotes
+        self.compteur = Counter()  # avec hotes : rempli par fermer()
+        self.compteur_ids = Counter()
+        self.total = 0
+
+    def ajouter(self, t):
+        if self.hotes is not None:
+            self.compteur_ids[t[self.champ + "_id"]] += 1
+        else:
+            self.compteur[t[self.champ]] += 1
+        self.total += 1
+
+    def fermer(self):
+        if self.hotes is not None:
+            self.compteur = self.hotes.traduire(self.compteur_ids)
+
+# trames pcapng : trames par interface de capture, et IP source de chacune
+class PuitsInterfaces:
+    def __init__(self, capacite=None):  # capacite : IP source en top-K approché (--approx)
+        self.capacite = capacite
+        self.compteur = Counter()
+        self.par_interface = {}
+
+    def ajouter(self, t):
+        interface = t.get("interface", "")
+        self.compteur[interface] += 1
+        src = self.par_interface.get(interface)
+        if src is None:
+            src = self.par_interface[interface] = Counter() if self.capacite is None else SpaceSaving(self.capacite)
+        if self.capacite is None:
+            src[t["src"]] += 1
+        else:
+            src.ajouter(t["src"])
+
+    def fermer(self):
+        pass
+
+# état agrégé sauvegardé au point de reprise : IP source, volume, tranches horaires
+class PuitsEtat(PuitsCompteur):
+    def __init__(self, hotes):
+        super().__init__("src", hotes)
+        self.octets = 0
+        self.heures = Counter()
+
+    def ajouter(self, t):
+        self.compteur_ids[t["src_id"]] += 1
+        self.total += 1
+        self.octets += int(t["length"])
+        self.heures[t["us"] // 3600000000] += 1  # comme agreger_heures : 24 = 0h le lendemain
+
+    def vers_dict(self):
+        self.fermer()
+        return {
+            "src": list(self.compteur.items()),  # liste : l'ordre d'apparition est gardé
+            "total": self.total,
+            "octets": self.octets,
+            "heures": dict(self.heures)
+        }
+
+    def charger(self, etat):
+        for nom, nb in etat["src"]:
+            self.compteur_ids[self.hotes.id(nom)] = nb
+        self.total = etat["total"]
+        self.octets = etat["octets"]
+        self.heures = Counter({int(h): nb for h, nb in etat["heures"].items()})  # clés JSON en texte
+
+class PuitsDashboard(PuitsCompteur):
+    def __init__(self, hotes=None):
+        super().__init__("src", hotes)
+
+    def fermer(self):
+        super().fermer()
+        if self.total:
+            generer_dashboard(self.compteur, detecter_menaces(self.compteur, self.total))
+
+# ---------------- nombre d'éléments distincts en mémoire fixe (HyperLogLog, 2**precision octets)
+HLL_PRECISION = 8  # 256 registres par compteur, erreur type ~ 1.04 / 16 = 6.5 %
+
+@lru_cache(maxsize=65536)  # mêmes destinations / ports d'une trame à l'autre
+def hache64(valeur):
+    # stable d'un lancement à l'autre, contrairement à hash() (PYTHONHASHSEED)
+    return int.from_bytes(hashlib.blake2b(valeur.encode("utf-8"), digest_size=8).digest(), "little")
+
+class HyperLogLog:
+    __slots__ = ("precision", "registres")
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registres = bytearray(1 << precision)
+
+    def ajouter(self, valeur):
+        x = hache64(valeur)
+        p = self.precision
+        j = x >> (64 - p)                     # p premiers bits : numéro du registre
+        w = x & ((1 << (64 - p)) - 1)         # le reste : rang du premier bit à 1
+        rang = 64 - p - w.bit_length() + 1
+        if rang > self.registres[j]:
+            self.registres[j] = rang
+
+    def estimer(self):
+        m = len(self.registres)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimation = alpha * m * m / sum(2.0 ** -r for r in self.registres)
+        vides = self.registres.count(0)
+        if estimation <= 2.5 * m and vides:  # petites valeurs : comptage linéaire, plus juste
+            estimation = m * math.log(m / vides)
+        return round(estimation)
+
+# ---------------- agrégats en un seul passage : chaque appelant s'abonne à ceux qu'il veut,
+# ajouter une métrique = ajouter une entrée dans AGREGATS, pas un nouveau parcours des trames
+def agreger_src(c, t):
+    c[t["src"]] += 1
+
+def agreger_dst(c, t):
+    c[t["dst"]] += 1
+
+def agreger_octets_src(c, t):
+    if t["length"]:  # None : trame sans longueur connue (--protocoles)
+        c[t["src"]] += int(t["length"])
+
+def agreger_octets_dst(c, t):
+    if t["length"]:
+        c[t["dst"]] += int(t["length"])
+
+def agreger_port_src(c, t):
+    port = t.get("src_port")  # absent de TableTrames
+    if port:
+        c[port] += 1
+
+def agreger_port_dst(c, t):
+    port = t.get("dst_port")
+    if port:
+        c[port] += 1
+
+def agreger_secondes(c, t):  # clé : secondes depuis minuit du 1er jour
+    c[t["us"] // 1000000] += 1
+
+def agreger_heures(c, t):  # clé : heures depuis minuit du 1er jour (24 = 0h le lendemain)
+    c[t["us"] // 3600000000] += 1
+
+def agreger_paires(c, t):
+    c[t["src"], t["dst"]] += 1
+
+# par IP source : HyperLogLog des destinations (balayage horizontal) et des ports visés (vertical)
+def agreger_dst_distinctes(c, t):
+    hll = c.get(t["src"])
+    if hll is None:
+        hll = c[t["src"]] = HyperLogLog()
+    hll.ajouter(t["dst"])
+
+def agreger_ports_distincts(c, t):
+    port = t.get("dst_port")
+    if not port:
+        return
+    hll = c.get(t["src"])
+    if hll is None:
+        hll = c[t["src"]] = HyperLogLog()
+    hll.ajouter(port)
+
+AGREGATS = {
+    "src": agreger_src,
+    "dst": agreger_dst,
+    "octets_src": agreger_octets_src,
+    "octets_dst": agreger_octets_dst,
+    "port_src": agreger_port_src,
+    "port_dst": agreger_port_dst,
+    "secondes": agreger_secondes,
+    "heures": agreger_heures,
+    "paires": agreger_paires,
+    "dst_distinctes": agreger_dst_distinctes,
+    "ports_distincts": agreger_ports_distincts,
+}
+
+# conteneur de chaque agrégat (Counter par défaut) : src -> HyperLogLog pour les distincts
+CONTENEURS_AGREGATS = {
+    "dst_distinctes": dict,
+    "ports_distincts": dict,
+}
+
+def valeurs_agregat(conteneur):  # Counter tel quel, HyperLogLog -> estimation
+    if isinstance(conteneur, Counter):
+        return conteneur
+    return Counter({cle: hll.estimer() for cle, hll in conteneur.items()})
+
+class PuitsAgregats:
+    def __init__(self, abonnements=tuple(AGREGATS)):
+        inconnus = [nom for nom in abonnements if nom not in AGREGATS]
+        if inconnus:
+            raise ValueError(f"agrégat inconnu : {', '.join(inconnus)} (choix : {', '.join(AGREGATS)})")
+        self.agregats = {nom: CONTENEURS_AGREGATS.get(nom, Counter)() for nom in abonnements}
+        self.mises_a_jour = [(AGREGATS[nom], compteur) for nom, compteur in self.agregats.items()]
+        self.total = 0
+
+    def ajouter(self, t):
+        for mise_a_jour, compteur in self.mises_a_jour:
+            mise_a_jour(compteur, t)
+        self.total += 1
+
+    def fermer(self):
+        pass
+
+    def __getitem__(self, nom):
+        return self.agregats[nom]
+
+def agreger(trames, abonnements=tuple(AGREGATS)):
+    puits = PuitsAgregats(abonnements)
+    diffuser(trames, [puits])
+    return puits
+
+# ---------------- top-K approché en mémoire bornée (Space-Saving) : au plus `capacite` hôtes
+# suivis, quel que soit le nombre d'IP distinctes (flood à sources usurpées)
+TOPK_CAPACITE = 1000  # erreur sur le compte d'une IP <= total / capacité
+
+class SpaceSaving:
+    def __init__(self, capacite=TOPK_CAPACITE):
+        self.capacite = capacite
+        self.comptes = {}
+        self.erreurs = {}  # surestimation possible de chaque compte
+        self.tas = []      # (compte au moment de l'ajout, clé) : une entrée par clé, rafraîchie à l'éviction
+        self.total = 0
+
+    def ajouter(self, cle, nb=1):
+        self.total += nb
+        comptes = self.comptes
+        if cle in comptes:
+            comptes[cle] += nb
+            return
+        if len(comptes) < self.capacite:
+            comptes[cle] = nb
+            self.erreurs[cle] = 0
+            heapq.heappush(self.tas, (nb, cle))
+            return
+        # plein : la clé la moins comptée cède sa place, son compte devient l'erreur de la nouvelle
+        tas = self.tas
+        while True:
+            compte, ancienne = tas[0]
+            actuel = comptes[ancienne]
+            if actuel == compte:
+                break
+            heapq.heapreplace(tas, (actuel, ancienne))
+        del comptes[ancienne]
+        del self.erreurs[ancienne]
+        comptes[cle] = compte + nb
+        self.erreurs[cle] = compte
+        heapq.heapreplace(tas, (compte + nb, cle))
+
+    def erreur_max(self):
+        # tant que la table n'est pas pleine, les comptes sont exacts
+        return min(self.comptes.values()) if len(self.comptes) >= self.capacite else 0
+
+    # même interface que Counter pour afficher_table, afficher_console et generer_dashboard
+    def most_common(self, n=None):
+        if n is None:
+            return sorted(self.comptes.items(), key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(n, self.comptes.items(), key=lambda item: item[1])
+
+    def __getitem__(self, cle):
+        return self.comptes.get(cle, 0)
+
+    def __contains__(self, cle):
+        return cle in self.comptes
+
+    def __len__(self):
+        return len(self.comptes)
+
+    def __iter__(self):
+        return iter(self.comptes)
+
+    def keys(self):
+        return self.comptes.keys()
+
+    def values(self):  # leur somme reste égale au total exact
+        return self.comptes.values()
+
+    def items(self):
+        return self.comptes.items()
+
+class PuitsTopK:
+    def __init__(self, champ="src", capacite=TOPK_CAPACITE):
+        self.champ = champ
+        self.compteur = SpaceSaving(capacite)
+        self.total = 0
+
+    def ajouter(self, t):
+        self.compteur.ajouter(t[self.champ])
+        self.total += 1
+
+    def fermer(self):
+        pass
+
+# ---------------- débit par source sur fenêtres glissantes (1 s / 10 s / 60 s) : un flood de
+# quelques secondes reste visible dans une capture de plusieurs heures, ce que les totaux cachent
+FENETRES_DEBIT = ((1, 10), (10, 10), (60, 12))  # (durée en secondes, nombre de cases de l'anneau)
+SEUILS_DEBIT = {1: 200, 10: 1000, 60: 3000}     # trames d'une même source dans la fenêtre
+
+class Fenetre:
+    # anneau de cases de durée/nb_cases : la somme couvre la dernière durée, à une case près
+    __slots__ = ("largeur", "cases", "somme", "tete", "alerte")
+
+    def __init__(self, duree, nb_cases):
+        self.largeur = duree * 1000000 // nb_cases
+        self.cases = [0] * nb_cases
+        self.somme = 0
+        self.tete = None  # numéro absolu de la case la plus récente
+        self.alerte = None
+
+    def ajouter(self, us, nb=1):
+        case = us // self.largeur
+        cases = self.cases
+        taille = len(cases)
+        if self.tete is None:
+            self.tete = case
+        elif case > self.tete:
+            # on vide les cases sorties de la fenêtre : au plus taille cases, O(1) par trame
+            if case - self.tete >= taille:
+                for i in range(taille):
+                    cases[i] = 0
+                self.somme = 0
+            else:
+                for i in range(self.tete + 1, case + 1):
+                    self.somme -= cases[i % taille]
+                    cases[i % taille] = 0
+            self.tete = case
+        elif case <= self.tete - taille:  # trame en retard, déjà sortie de la fenêtre
+            return self.somme
+        cases[case % taille] += nb
+        self.somme += nb
+        return self.somme
+
+    def vide(self, us):
+        return self.tete is None or us // self.largeur - self.tete >= len(self.cases)
+
+class MoteurDebit:
+    # puits : une alerte par épisode, quand une source dépasse le seuil d'une fenêtre
+    # (fin d'épisode quand elle repasse sous la moitié du seuil)
+    def __init__(self, seuils=SEUILS_DEBIT, fenetres=FENETRES_DEBIT, champ="src", signaler=None, filtre=None):
+        self.fenetres = sorted((duree, nb) for duree, nb in fenetres if duree in seuils)
+        self.seuils = [seuils[duree] for duree, _ in self.fenetres]
+        self.champ = champ
+        self.signaler = signaler  # appelé à chaque nouvelle alerte (mode suivi)
+        self.filtre = filtre      # ex. lambda t: t["flags"] & TCP_SYN avec iterer_trames_tcp
+        self.sources = {}
+        self.alertes = []
+        self.prochaine_purge = None
+
+    def ajouter(self, t):
+        if self.filtre is not None and not self.filtre(t):
+            return
+        us = t["us"]
+        cle = t[self.champ]
+        etat = self.sources.get(cle)
+        if etat is None:
+            etat = self.sources[cle] = [Fenetre(duree, nb) for duree, nb in self.fenetres]
+        for (duree, _), seuil, fenetre in zip(self.fenetres, self.seuils, etat):
+            somme = fenetre.ajouter(us)
+            alerte = fenetre.alerte
+            if alerte is not None:
+                if somme > alerte["pic"]:
+                    alerte["pic"] = somme
+                elif somme < seuil // 2:
+                    fenetre.alerte = None
+            elif somme >= seuil:
+                alerte = fenetre.alerte = {"us": us, "src": cle, "fenetre": duree, "seuil": seuil, "pic": somme}
+                self.alertes.append(alerte)
+                if self.signaler is not None:
+                    self.signaler(alerte)
+        if self.prochaine_purge is None:
+            self.prochaine_purge = us + self.fenetres[-1][0] * 1000000
+        elif us >= self.prochaine_purge:
+            self.purger(us)
+
+    def purger(self, us):
+        # sources muettes depuis la plus longue fenêtre : plus rien à compter, on les oublie
+        self.sources = {cle: etat for cle, etat in self.sources.items() if not etat[-1].vide(us)}
+        self.prochaine_purge = us + self.fenetres[-1][0] * 1000000
+
+    def fermer(self):
+        pass
+
+# ---------------- table des flux (conversations) : clé (src, port src, dst, port dst, proto),
+# sens aller = celui de la 1re trame ; un flux muet depuis delai secondes est écrit dans
+# flux.csv puis oublié, la table ne garde que les conversations en cours
+DELAI_INACTIVITE_FLUX = 60  # secondes de capture
+MAX_FLUX = 500000           # au-delà, le flux le moins récemment actif est écrit et oublié
+CHAMPS_FLUX = ["debut", "fin", "duree", "src", "src_port", "dst", "dst_port", "proto",
+               "paquets_aller", "octets_aller", "paquets_retour", "octets_retour"]
+
+class Flux:
+    __slots__ = ("cle", "premier", "dernier", "paquets_aller", "octets_aller", "paquets_retour", "octets_retour")
+
+    def __init__(self, cle, us):
+        self.cle = cle
+        self.premier = self.dernier = us
+        self.paquets_aller = self.octets_aller = 0
+        self.paquets_retour = self.octets_retour = 0
+
+    def ligne_csv(self):
+        src, src_port, dst, dst_port, proto = self.cle
+        return (format_hms(self.premier), format_hms(self.dernier), f"{(self.dernier - self.premier) / 1000000:.6f}",
+                src, src_port, dst, dst_port, proto,
+                self.paquets_aller, self.octets_aller, self.paquets_retour, self.octets_retour)
+
+class PuitsFlux:
+    def __init__(self, chemin_csv="flux.csv", delai=DELAI_INACTIVITE_FLUX, max_flux=MAX_FLUX):
+        self.chemin_csv = chemin_csv
+        self.delai_us = delai * 1000000
+        self.max_flux = max_flux
+        self.flux = OrderedDict()  # ordre = dernière activité : les inactifs sont en tête
+        self.f = None
+        self.writer = None
+        self.nb_ecrits = 0
+
+    def ajouter(self, t):
+        us = t["us"]
+        longueur = int(t["length"]) if t["length"] else 0
+        proto = t.get("proto", "ip")
+        if proto in AVEC_PORT:
+            cle = (t["src"], t.get("src_port", ""), t["dst"], t.get("dst_port", ""), proto)
+        else:  # ICMP, GRE, ... : adresse entière, pas de port (même si un lecteur en rendait un)
+            cle = (t["src"], "", t["dst"], "", proto)
+        table = self.flux
+        f = table.get(cle)
+        if f is not None:
+            f.paquets_aller += 1
+            f.octets_aller += longueur
+        else:
+            f = table.get((cle[2], cle[3], cle[0], cle[1], proto))
+            if f is not None:
+                f.paquets_retour += 1
+                f.octets_retour += longueur
+            else:
+                f = table[cle] = Flux(cle, us)
+                f.paquets_aller = 1
+                f.octets_aller = longueur
+        if us > f.dernier:
+            f.dernier = us
+        table.move_to_end(f.cle)
+        # expiration O(1) amortie : on ne regarde que la tête, la plus ancienne activité
+        limite = us - self.delai_us
+        while table:
+            ancien = next(iter(table.values()))
+            if ancien.dernier >= limite and len(table) <= self.max_flux:
+                break
+            self.ecrire(table.popitem(last=False)[1])
+
+    def ecrire(self, f):
+        if self.f is None:  # pas de CSV vide
+            self.f = open(self.chemin_csv, mode="w", newline="", encoding="utf-8")
+            self.writer = csv.writer(self.f)
+            self.writer.writerow(CHAMPS_FLUX)
+        self.writer.writerow(f.ligne_csv())
+        self.nb_ecrits += 1
+
+    def fermer(self):
+        for f in sorted(self.flux.values(), key=lambda f: f.premier):  # flux encore ouverts
+            self.ecrire(f)
+        self.flux.clear()
+        if self.f is not None:
+            self.f.close()
+            print(f"CSV créé : {self.chemin_csv} ({self.nb_ecrits} flux)")
+
+def afficher_alerte(alerte):
+    print(f"{format_hms(alerte['us'])} ALERTE débit : {alerte['src']} >= {alerte['seuil']} trames "
+          f"en {alerte['fenetre']} s")
+
+def diffuser(trames, puits):
+    for t in trames:
+        for p in puits:
+            p.ajouter(t)
+    for p in puits:
+        p.fermer()
+
 # ---------------- analyse trames
 def analyser(trames):
+    if isinstance(trames, TableTrames):
+        return trames.compter("src")
     src = Counter(t["src"] for t in trames)
     return src
 
+# ---------------- reprise : point de reprise (octet atteint + état) sauvegardé régulièrement
+INTERVALLE_REPRISE = 30.0  # secondes entre deux sauvegardes
+OCTETS_EMPREINTE = 65536   # début du fichier haché pour reconnaître la même capture
+
+def chemin_reprise(chemin):
+    return chemin + ".reprise.json"
+
+def identite_fichier(chemin, octets):
+    # inode + empreinte des premiers octets déjà lus : un fichier complété garde la même identité
+    with open(chemin, "rb") as f:
+        empreinte = hashlib.sha1(f.read(octets)).hexdigest()
+    return {"inode": os.stat(chemin).st_ino, "octets": octets, "sha1": empreinte}
+
+def empreinte_csv(chemin_csv, taille):
+    # empreinte des derniers octets écrits avant le point de reprise : un CSV réécrit
+    # par une autre analyse n'a pas les mêmes lignes à cet endroit
+    debut = max(taille - OCTETS_EMPREINTE, 0)
+    with open(chemin_csv, "rb") as f:
+        f.seek(debut)
+        return hashlib.sha1(f.read(taille - debut)).hexdigest()
+
+def sauver_reprise(chemin, position, etat, chemin_csv, taille_csv, horloge):
+    point = {
+        "fichier": identite_fichier(chemin, min(position, OCTETS_EMPREINTE)),
+        "position": position,
+        "csv": chemin_csv,
+        "taille_csv": taille_csv,
+        "mtime_csv": os.stat(chemin_csv).st_mtime_ns if taille_csv else None,
+        "sha1_csv": empreinte_csv(chemin_csv, taille_csv) if taille_csv else None,
+        "horloge": [horloge.jour, horloge.precedent],  # jours déjà passés à la reprise
+        "etat": etat.vers_dict()
+    }
+    temporaire = chemin_reprise(chemin) + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        json.dump(point, f)
+    os.replace(temporaire, chemin_reprise(chemin))  # jamais de point de reprise à moitié écrit
+
+def charger_reprise(chemin, chemin_csv):
+    try:
+        with open(chemin_reprise(chemin), "r", encoding="utf-8") as f:
+            point = json.load(f)
+    except (OSError, ValueError):
+        return None
+    identite = point["fichier"]
+    if (os.path.getsize(chemin) < point["position"]
+            or identite_fichier(chemin, identite["octets"]) != identite
+            or point["csv"] != chemin_csv
+            or point["taille_csv"] and not csv_reprise_valide(chemin_csv, point)):
+        return None  # autre fichier, fichier réécrit, CSV perdu ou écrasé : on repart de zéro
+    return point
+
+def csv_reprise_valide(chemin_csv, point):
+    # mtime inchangé : CSV tel que sauvegardé ; sinon (lignes ajoutées avant une interruption,
+    # ou CSV d'une autre analyse) on compare l'empreinte de la partie déjà écrite
+    try:
+        stat = os.stat(chemin_csv)
+    except OSError:
+        return False
+    if stat.st_size < point["taille_csv"] or point.get("sha1_csv") is None:
+        return False
+    if stat.st_mtime_ns == point["mtime_csv"]:
+        return True
+    return empreinte_csv(chemin_csv, point["taille_csv"]) == point["sha1_csv"]
+
+def analyser_avec_reprise(chemin, chemin_csv="trames.csv", intervalle=INTERVALLE_REPRISE):
+    hotes = TableHotes()
+    etat = PuitsEtat(hotes)
+    point = charger_reprise(chemin, chemin_csv)
+    position = 0
+    taille_csv = 0
+    horloge = Horloge()  # une seule pour tous les blocs : le passage de minuit n'est pas perdu
+    if point is not None:
+        etat.charger(point["etat"])
+        horloge.jour, horloge.precedent = point.get("horloge", (0, None))
+        position = point["position"]
+        taille_csv = point["taille_csv"]
+        print(f"Reprise à l'octet {position} ({etat.total} trames déjà analysées)")
+    puits_csv = PuitsCSV(chemin_csv, hotes, taille_csv)
+
+    prochaine_sauvegarde = time.monotonic() + intervalle
+    with open(chemin, "rb") as f:
+        f.seek(position)
+        while True:
+            lignes = f.readlines(TAILLE_BLOC)  # lignes complètes, ~TAILLE_BLOC octets
+            partielle = bool(lignes) and not lignes[-1].endswith(b"\n")
+            if partielle:  # fin de fichier en cours d'écriture : relue en entier à la reprise
+                lignes.pop()
+            if not lignes:
+                break
+            position += sum(map(len, lignes))
+            for t in numeroter_hotes(iterer_trames_lignes([l.decode("utf-8") for l in lignes], horloge), hotes):
+                puits_csv.ajouter(t)
+                etat.ajouter(t)
+            if time.monotonic() >= prochaine_sauvegarde:
+                sauver_reprise(chemin, position, etat, chemin_csv, puits_csv.vider(), horloge)
+                prochaine_sauvegarde = time.monotonic() + intervalle
+            if partielle:
+                break
+    taille_csv = puits_csv.vider()
+    puits_csv.fermer()
+    sauver_reprise(chemin, position, etat, chemin_csv, taille_csv, horloge)  # un ajout en fin de fichier repartira d'ici
+    etat.fermer()
+    return etat
+
+# ---------------- découpage du fichier en plages d'octets alignées sur les lignes
+def decouper_fichier(chemin, nb_morceaux):
+    taille = os.path.getsize(chemin)
+    bornes = [0]
+    with open(chemin, "rb") as f:
+        for i in range(1, nb_morceaux):
+            f.seek(max(taille * i // nb_morceaux - 1, 0))
+            f.readline()  # on avance jusqu'au début de la ligne suivante
+            position = f.tell()
+            if bornes[-1] < position < taille:
+                bornes.append(position)
+    bornes.append(taille)
+    return list(zip(bornes, bornes[1:]))
+
+def lire_lignes_morceau(chemin, debut, fin):
+    with open(chemin, "rb") as f:
+        f.seek(debut)
+        position = debut
+        while position < fin:
+            ligne = f.readline()
+            if not ligne:
+                break
+            position += len(ligne)
+            yield ligne.decode("utf-8")
+
+# ---------------- travail d'un processus : compteurs partiels (+ CSV partiel sans entête)
+def compter_et_ecrire(trames, chemin_csv=None):
+    hotes = TableHotes()  # numéros propres au processus, traduits en noms au retour
+    src_ids = Counter()
+    total = 0
+    f = None
+    if chemin_csv:
+        f = open(chemin_csv, mode="w", newline="", encoding="utf-8")
+        writer = csv.writer(f)
+    for t in numeroter_hotes(trames, hotes):
+        src_ids[t["src_id"]] += 1
+        total += 1
+        if f:
+            writer.writerow(ligne_csv_ids(t, hotes))
+    if f:
+        f.close()
+    return hotes.traduire(src_ids), total
+
+def analyser_morceau(chemin, debut, fin, chemin_csv=None, lecteur="texte"):
+    if lecteur == "mmap":
+        trames = iterer_trames_mmap(chemin, debut, fin)
+    else:
+        trames = iterer_trames_lignes(lire_lignes_morceau(chemin, debut, fin))
+    return compter_et_ecrire(trames, chemin_csv)
+
+# CSV final = entête + parties dans l'ordre ; les parties sont supprimées
+def fusionner_csv(parties, chemin_csv, total):
+    if total:
+        with open(chemin_csv, mode="w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(CHAMPS_CSV)
+            for partie in parties:
+                with open(partie, "r", newline="", encoding="utf-8") as p:
+                    shutil.copyfileobj(p, f)
+        print(f"CSV créé : {chemin_csv}")
+    for partie in parties:
+        os.remove(partie)
+
+# ---------------- analyse multi-processus (résultat identique à analyser)
+def analyser_parallele(chemin, nb_processus=None, chemin_csv=None, lecteur="texte"):
+    nb_processus = nb_processus or os.cpu_count() or 1
+    plages = decouper_fichier(chemin, nb_processus * 4)  # plusieurs morceaux par coeur
+    parties = [f"{chemin_csv}.part{i}" if chemin_csv else None for i in range(len(plages))]
+
+    src = Counter()
+    total = 0
+    with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+        # map rend les résultats dans l'ordre du fichier : mêmes égalités
+        # dans most_common que la lecture en série
+        resultats = pool.map(analyser_morceau,
+                             [chemin] * len(plages),
+                             [d for d, _ in plages],
+                             [f for _, f in plages],
+                             parties,
+                             [lecteur] * len(plages))
+        for src_partiel, total_partiel in resultats:
+            src.update(src_partiel)
+            total += total_partiel
+
+    if chemin_csv:
+        fusionner_csv(parties, chemin_csv, total)
+
+    return src, total
+
+# ---------------- lot de fichiers (rotation tcpdump -C / -G) : un processus par fichier
+def lecteur_fichier(chemin):  # texte compressé : iterer_trames ; pcap compressé : décompressé à part
+    return detecter_lecteur(chemin)
+
+# pcap / pcapng, ou texte UTF-8 sans octet nul au début (écarte .pdf, .png, .zip... du dossier)
+def est_capture(chemin):
+    try:
+        if detecter_lecteur(chemin) != "texte":
+            return True
+        with ouvrir_capture(chemin) as f:
+            debut = f.read(4096)
+        codecs.getincrementaldecoder("utf-8")().decode(debut)  # caractère coupé en fin de bloc toléré
+    except (OSError, EOFError, UnicodeDecodeError, lzma.LZMAError):  # archive corrompue, binaire
+        return False
+    return b"\0" not in debut
+
+def cle_nom_naturel(nom):  # capture.txt2 avant capture.txt10
+    return [int(morceau) if morceau.isdigit() else morceau for morceau in re.split(r"(\d+)", nom)]
+
+def debut_capture(chemin):
+    # pcap : horodatage du 1er paquet ; sinon date de modification (tcpdump -C / -G écrit dans l'ordre)
+    if lecteur_fichier(chemin) == "pcap":
+        with ouvrir_capture(chemin) as f:
+            entete = f.read(28)
+        if len(entete) == 28:
+            boutisme, _ = PCAP_MAGIC[entete[:4]]
+            return struct.unpack(boutisme + "I", entete[24:28])[0], cle_nom_naturel(chemin)
+    return os.path.getmtime(chemin), cle_nom_naturel(chemin)
+
+def lister_captures(cible):
+    if os.path.isdir(cible):
+        chemins = [os.path.join(cible, nom) for nom in os.listdir(cible)
+                   if not nom.startswith(".") and not nom.endswith((".reprise.json", ".tmp"))]
+    elif any(c in cible for c in "*?["):
+        chemins = glob.glob(cible)
+    else:
+        chemins = [cible]
+    captures = []
+    for c in chemins:
+        if not os.path.isfile(c):
+            continue
+        if est_capture(c):
+            captures.append(c)
+        else:
+            print(f"Ignoré (pas une capture) : {c}")
+    return sorted(captures, key=debut_capture)
+
+def analyser_fichier_lot(chemin, chemin_csv=None):
+    return compter_et_ecrire(LECTEURS[lecteur_fichier(chemin)](chemin), chemin_csv)
+
+def analyser_lot(chemins, nb_processus=None, chemin_csv=None):
+    nb_processus = nb_processus or os.cpu_count() or 1
+    parties = [f"{chemin_csv}.part{i}" if chemin_csv else None for i in range(len(chemins))]
+    src = Counter()
+    total = 0
+    details = []  # (fichier, trames, Counter des IP source du fichier)
+    if nb_processus <= 1:  # -j 1 : dans ce processus, fichier après fichier
+        for chemin, partie in zip(chemins, parties):
+            src_fichier, total_fichier = analyser_fichier_lot(chemin, partie)
+            src.update(src_fichier)
+            total += total_fichier
+            details.append((chemin, total_fichier, src_fichier))
+    else:
+        with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+            # fusion dans l'ordre de capture, quel que soit le processus qui finit le premier
+            for chemin, (src_fichier, total_fichier) in zip(chemins, pool.map(analyser_fichier_lot, chemins, parties)):
+                src.update(src_fichier)
+                total += total_fichier
+                details.append((chemin, total_fichier, src_fichier))
+    if chemin_csv:
+        fusionner_csv(parties, chemin_csv, total)
+    return src, total, details
+
+def lancer_lot(cible, processus=None, interface=True):
+    chemins = lister_captures(cible)
+    if not chemins:
+        print(f"Aucun fichier trouvé : {cible}")
+        return
+    src, total, details = analyser_lot(chemins, processus, "trames.csv")
+    if not total:
+        print("Aucune trame valide détectée")
+        return
+    fichiers = [(os.path.basename(c), nb, (s.most_common(1) or [("-", 0)])[0]) for c, nb, s in details]
+    generer_dashboard(src, detecter_menaces(src, total), fichiers=fichiers)
+    print(f"{len(chemins)} fichiers, {total} trames")
+    for nom, nb, (ip, nb_ip) in fichiers:
+        print(f"  {nom:<30} {nb:>10} trames   {ip} ({nb_ip})")
+    if interface:
+        afficher_table("IP source", src)
+        webbrowser.open("dashboard.html")
+    else:
+        afficher_console("IP source", src)
+
 # ---------------- détection menaces (on envoie tout au JS)
 def detecter_menaces(src, total):
     return dict(src)  # on prend toutes les IP pour le top N
 
+# ---------------- analyse TCP : combinaisons de flags et SYN sans ACK par IP source
+def analyser_tcp(trames):
+    drapeaux = Counter()
+    syn_seuls = Counter()
+    for t in trames:
+        masque = t["flags"]
+        drapeaux[masque] += 1
+        if masque & (TCP_SYN | TCP_ACK) == TCP_SYN:  # ouverture de connexion (ou scan SYN)
+            syn_seuls[t["src"]] += 1
+    return drapeaux, syn_seuls
+
+# affichage des clés qui ne sont pas des noms d'hôte
+FORMATS_AGREGATS = {
+    "secondes": lambda s: format_hms(s * 1000000) + (f" (jour {s // 86400 + 1})" if s >= 86400 else ""),
+    "heures": lambda h: f"{h % 24:02d}h" + (f" (jour {h // 24 + 1})" if h >= 24 else ""),
+    "paires": lambda paire: f"{paire[0]} > {paire[1]}",
+}
+
+def lancer_agregats(chemin, abonnements):
+    puits = agreger(LECTEURS[lecteur_fichier(chemin)](chemin), abonnements)
+    print(f"{puits.total} trames")
+    for nom in abonnements:
+        formater = FORMATS_AGREGATS.get(nom, str)
+        afficher_console(nom, Counter({formater(cle): nb for cle, nb in valeurs_agregat(puits[nom]).items()}))
+
+# ---------------- balayages : une source qui touche beaucoup d'hôtes ou de ports distincts
+# (un client bavard envoie beaucoup de trames, mais vers peu de destinations).
+# Ping sweep : les lecteurs gardent les adresses ICMP entières (hors AVEC_PORT), la source compte
+# en horizontal et jamais en vertical, faute de port. Texte, pcap et pcapng donnent les mêmes ports
+SEUIL_BALAYAGE_HORIZONTAL = 50  # hôtes distincts
+SEUIL_BALAYAGE_VERTICAL = 50    # ports distincts
+
+def detecter_balayages(puits, seuil_horizontal=SEUIL_BALAYAGE_HORIZONTAL, seuil_vertical=SEUIL_BALAYAGE_VERTICAL):
+    hotes = valeurs_agregat(puits["dst_distinctes"])
+    ports = valeurs_agregat(puits["ports_distincts"])
+    horizontaux = Counter({ip: nb for ip, nb in hotes.items() if nb >= seuil_horizontal})
+    verticaux = Counter({ip: nb for ip, nb in ports.items() if nb >= seuil_vertical})
+    return horizontaux, verticaux
+
+def lancer_balayages(chemin):
+    puits = agreger(LECTEURS[lecteur_fichier(chemin)](chemin), ("dst_distinctes", "ports_distincts"))
+    horizontaux, verticaux = detecter_balayages(puits)
+    print(f"{puits.total} trames, {len(puits['dst_distinctes'])} IP source")
+    afficher_console(f"Balayage horizontal (>= {SEUIL_BALAYAGE_HORIZONTAL} hôtes distincts, estimation)", horizontaux)
+    afficher_console(f"Balayage vertical (>= {SEUIL_BALAYAGE_VERTICAL} ports distincts, estimation)", verticaux)
+
+def lancer_debit(chemin):
+    moteur = MoteurDebit()
+    diffuser(LECTEURS[lecteur_fichier(chemin)](chemin), [moteur])
+    if not moteur.alertes:
+        print("Aucun pic de débit au-dessus des seuils " +
+              ", ".join(f"{duree} s : {seuil}" for (duree, _), seuil in zip(moteur.fenetres, moteur.seuils)))
+    for alerte in moteur.alertes:
+        print(f"{format_hms(alerte['us'])}  {alerte['src']:<40} fenêtre {alerte['fenetre']:>2} s  "
+              f"pic {alerte['pic']} trames (seuil {alerte['seuil']})")
+
+def lancer_tcp(chemin):
+    lecteur = detecter_lecteur(chemin)
+    if lecteur != "texte":  # flags lus dans le texte de tcpdump, pas dans les en-têtes binaires
+        print(f"--tcp : sortie texte de tcpdump uniquement, {lecteur} non pris en charge ({chemin})")
+        return
+    drapeaux, syn_seuls = analyser_tcp(iterer_trames(chemin, iterer_trames_tcp))
+    print("Flags TCP")
+    for masque, nb in drapeaux.most_common():
+        print(f"  [{texte_drapeaux(masque)}]".ljust(42) + f" {nb}")
+    afficher_console("SYN sans ACK par IP source", syn_seuls)
+
+# ---------------- répartition par protocole (IP, IP6, ARP, TCP / UDP / ICMP)
+def lancer_protocoles(chemin):
+    lecteur = detecter_lecteur(chemin)
+    if lecteur != "texte":  # table de dispatch sur les lignes texte de tcpdump
+        print(f"--protocoles : sortie texte de tcpdump uniquement, {lecteur} non pris en charge ({chemin})")
+        return
+    compteurs = Counter()
+    src = PuitsCompteur("src")
+    diffuser(iterer_trames(chemin, lambda lignes: iterer_trames_protocoles(lignes, compteurs)), [src])
+    print("Protocoles")
+    for proto, nb in compteurs.most_common():
+        print(f"  {proto:<40} {nb}")
+    afficher_console("IP source (tous protocoles)", src.compteur)
+
+# ---------------- affichage console (mode sans interface)
+def afficher_console(titre, compteur):
+    print(titre)
+    for ip, nb in compteur.most_common(20):
+        print(f"  {ip:<40} {nb}")
+
 # ---------------- affichage Tkinter
 def afficher_table(titre, compteur):
     fen = tk.Toplevel()
@@ -81,14 +1949,34 @@ def afficher_table(titre, compteur):
         tree.insert("", "end", values=(ip, nb))
 
 # ---------------- génération dashboard HTML
-def generer_dashboard(src, menaces):
+def generer_dashboard(src, menaces=None, rafraichissement=None, fichiers=None):
+    if isinstance(src, TableTrames):
+        src = analyser(src)
+    if menaces is None:
+        menaces = detecter_menaces(src, sum(src.values()))
     src10 = dict(src.most_common(10))
     menaces_js = [{"ip": ip, "nb": nb} for ip, nb in menaces.items()]
+    # mode suivi : le navigateur recharge la page toute seule
+    meta_refresh = f'\n<meta http-equiv="refresh" content="{rafraichissement}">' if rafraichissement else ""
+    # analyse d'un lot : détail par fichier (nom, trames, IP source principale)
+    section_fichiers = ""
+    if fichiers:
+        lignes = ''.join(f"<tr><td>{escape(nom)}</td><td>{nb}</td><td>{ip} ({nb_ip})</td></tr>"
+                         for nom, nb, (ip, nb_ip) in fichiers)
+        section_fichiers = f"""
+<section>
+<h3>Détail par fichier</h3>
+<table>
+<tr><th>Fichier</th><th>Trames</th><th>IP source principale</th></tr>
+{lignes}
+</table>
+</section>
+"""
 
     html = f"""<!DOCTYPE html>
 <html lang="fr">
 <head>
-<meta charset="utf-8">
+<meta charset="utf-8">{meta_refresh}
 <title>Dashboard IP Source</title>
 <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
 <style>
@@ -177,7 +2065,7 @@ th {{ background: var(--th-bg); }}
 {''.join(f"<tr><td>{ip}</td><td>{nb}</td></tr>" for ip,nb in src10.items())}
 </table>
 </section>
-
+{section_fichiers}
 <section>
 <h3>Menaces détectées (IP source uniquement)</h3>
 <label for="limitMenaces">Nombre de menaces à afficher: </label>
@@ -267,33 +2155,280 @@ updateMenaces();
     with open("dashboard.html","w",encoding="utf-8") as f:
         f.write(html)
 
-# ---------------- lancement analyse
-def lancer_analyse(chemin):
-    trames = lire_fichier(chemin)
-    if not trames:
+# ---------------- mesure du pré-filtre (python V6.7.py --bench fichier.txt)
+def mesurer_prefiltre(chemin, repetitions=20):
+    with open(chemin, "r", encoding="utf-8") as f:
+        lignes = f.readlines()
+
+    def sans_prefiltre():
+        return sum(1 for ligne in lignes if pattern.search(ligne))
+
+    def avec_prefiltre():
+        return sum(1 for ligne in lignes if not ligne_hexa(ligne) and pattern.search(ligne))
+
+    hexa = sum(map(ligne_hexa, lignes))
+    print(f"{len(lignes)} lignes : hexa={hexa}, autres={len(lignes) - hexa}")
+
+    resultats = {}
+    for nom, fonction in (("regex sur chaque ligne", sans_prefiltre),
+                          ("pré-filtre ligne_hexa", avec_prefiltre)):
+        meilleur = None
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            nb = fonction()
+            duree = time.perf_counter() - debut
+            meilleur = duree if meilleur is None else min(meilleur, duree)
+        resultats[nom] = (meilleur, nb)
+
+    reference, nb_ref = resultats["regex sur chaque ligne"]
+    for nom, (duree, nb) in resultats.items():
+        verif = "ok" if nb == nb_ref else f"ERREUR ({nb} trames au lieu de {nb_ref})"
+        print(f"{nom:<24} {duree * 1000:8.2f} ms  x{reference / duree:5.1f}  {nb} trames {verif}")
+
+# ---------------- lancement analyse (lecture unique en flux, ou en parallèle)
+def lancer_analyse(chemin, processus=1, interface=True, lecteur="auto", reprise=False, cache=False, approx=None,
+                   flux=False):
+    if detecter_compression(chemin) is not None:  # flux compressé : lecture en série uniquement
+        lecteur, processus = detecter_lecteur(chemin), 1  # texte, ou pcap / pcapng décompressé
+        reprise = False
+    elif lecteur == "auto":
+        lecteur = detecter_lecteur(chemin)
+    if flux:  # table des flux : toutes les trames dans l'ordre, en un seul passage
+        processus, reprise, cache = 1, False, False
+    puits_flux = [PuitsFlux("flux.csv")] if flux else []
+    etat = topk = None
+    if reprise and lecteur in ("texte", "mmap"):  # reprise par position d'octet : capture texte non compressée
+        etat = analyser_avec_reprise(chemin, "trames.csv")
+        src, total = etat.compteur, etat.total
+        if total:
+            generer_dashboard(src, detecter_menaces(src, total))
+    elif cache and lecteur != "pcapng":  # pas de colonne interface dans le cache
+        table = lire_fichier_cache(chemin, lecteur)
+        total = len(table)
+        if total:
+            sauvegarder_csv(table, "trames.csv")
+            src = analyser(table)
+            generer_dashboard(src, detecter_menaces(src, total))
+    elif approx:  # ni TableHotes ni Counter complet : mémoire fixe, CSV écrit au fil de l'eau
+        topk = PuitsTopK("src", approx)
+        puits = [PuitsCSV("trames.csv"), topk] + puits_flux
+        if lecteur == "pcapng":
+            interfaces = PuitsInterfaces(approx)
+            puits.append(interfaces)
+        diffuser(LECTEURS[lecteur](chemin), puits)
+        src, total = topk.compteur, topk.total
+        if total:
+            generer_dashboard(src, detecter_menaces(src, total))
+    elif processus > 1 and lecteur in ("texte", "mmap"):  # découpage par lignes : texte seulement
+        src, total = analyser_parallele(chemin, processus, "trames.csv", lecteur)
+        if total:
+            generer_dashboard(src, detecter_menaces(src, total))
+    else:
+        hotes = TableHotes()
+        dashboard = PuitsDashboard(hotes)
+        puits = [PuitsCSV("trames.csv", hotes), dashboard] + puits_flux
+        if lecteur == "pcapng":
+            interfaces = PuitsInterfaces()
+            puits.append(interfaces)
+        diffuser(numeroter_hotes(LECTEURS[lecteur](chemin), hotes), puits)
+        src, total = dashboard.compteur, dashboard.total
+    if not total:
         print("Aucune trame valide détectée")
         return
 
-    sauvegarder_csv(trames, "trames.csv")
+    if interface:
+        afficher_table("IP source", src)
+        webbrowser.open("dashboard.html")
+    else:
+        afficher_console("IP source", src)
+        if lecteur == "pcapng":
+            afficher_console("Interfaces de capture", interfaces.compteur)
+            if len(interfaces.par_interface) > 1:
+                for nom, src_interface in sorted(interfaces.par_interface.items()):
+                    afficher_console(f"IP source sur {nom}", src_interface)
+        if topk is not None:  # --reprise / --cache passent avant : compteur exact, sans erreur_max
+            print(f"top-K approché : {len(src)}/{approx} IP suivies, "
+                  f"compte surestimé d'au plus {src.erreur_max()} trames")
+        if etat is not None:
+            print(f"{etat.total} trames, {etat.octets} octets")
+            heure = FORMATS_AGREGATS["heures"]
+            print("Trames par heure : " + ", ".join(f"{heure(h)}={nb}" for h, nb in sorted(etat.heures.items())))
+        if processus <= 1 and lecteur in ("texte", "mmap"):  # en parallèle, chaque processus a son propre cache
+            stats = stats_cache_ip()
+            print(f"cache extraire_ip : {stats['taux']:.1%} de succès "
+                  f"({stats['succes']}/{stats['succes'] + stats['echecs']}), {stats['taille']}/{stats['max']} entrées")
+            stats = stats_horodatage()
+            print(f"horodatage : {stats['taux']:.1%} des trames dans une seconde déjà convertie "
+                  f"({stats['conversions']} conversions HH:MM:SS pour {stats['trames']} trames)")
 
-    src = analyser(trames)
-    menaces = detecter_menaces(src, len(trames))
+# ---------------- mode suivi : fichier alimenté en continu par tcpdump -l > capture.txt
+def rafraichir_suivi(compteur, intervalle):
+    compteur.fermer()  # numéros -> noms, coût proportionnel au nombre d'hôtes, pas de lignes
+    src = compteur.compteur
+    if not compteur.total:
+        print("Aucune trame valide pour l'instant")
+        return
+    generer_dashboard(src, detecter_menaces(src, compteur.total), rafraichissement=max(1, round(intervalle)))
+    print(f"{time.strftime('%H:%M:%S')} : {compteur.total} trames, {len(src)} IP source")
+    for ip, nb in src.most_common(5):
+        print(f"  {ip:<40} {nb}")
 
-    afficher_table("IP source", src)
+def suivre_fichier(chemin, intervalle=5.0, attente=0.5, depuis_debut=True, arret=None, compteur=None, debit=None):
+    hotes = compteur.hotes if compteur is not None else TableHotes()
+    compteur = compteur if compteur is not None else PuitsCompteur("src", hotes)
+    lignes = LignesIncrementales()
+    horloge = Horloge()
+    f = open(chemin, "rb")
+    if not depuis_debut:
+        f.seek(0, os.SEEK_END)
+    prochain = time.monotonic()
+    try:
+        while arret is None or not arret.is_set():
+            bloc = f.read(TAILLE_BLOC)
+            if bloc:  # seules les lignes ajoutées depuis la dernière lecture sont analysées
+                for t in numeroter_hotes(iterer_trames_lignes(lignes.decouper(bloc), horloge), hotes):
+                    compteur.ajouter(t)
+                    if debit is not None:
+                        debit.ajouter(t)
+            else:
+                try:
+                    stat = os.stat(chemin)
+                except FileNotFoundError:  # rotation en cours
+                    stat = None
+                if stat is not None and (stat.st_ino != os.fstat(f.fileno()).st_ino or stat.st_size < f.tell()):
+                    # fichier recréé ou tronqué : on reprend au début du nouveau, les compteurs continuent
+                    f.close()
+                    f = open(chemin, "rb")
+                    lignes.reinitialiser()
+                    continue
+                time.sleep(attente)
+            if time.monotonic() >= prochain:
+                rafraichir_suivi(compteur, intervalle)
+                prochain = time.monotonic() + intervalle
+    except KeyboardInterrupt:
+        pass
+    finally:
+        f.close()
+    rafraichir_suivi(compteur, intervalle)
+    return compteur
 
-    generer_dashboard(src, menaces)
-    webbrowser.open("dashboard.html")
+# ---------------- entrée standard : tcpdump -l | python V6.7.py -
+def lire_entree_standard(intervalle=5.0, flux=None, debit=None):
+    if flux is None:  # grand tampon de lecture sur le descripteur 0
+        flux = open(sys.stdin.fileno(), "rb", buffering=TAILLE_BLOC, closefd=False)
+    lire = getattr(flux, "read1", flux.read)  # read1 rend ce qui est disponible sans attendre un bloc plein
+    hotes = TableHotes()
+    compteur = PuitsCompteur("src", hotes)
+    lignes = LignesIncrementales()
+    horloge = Horloge()
+    prochain = time.monotonic() + intervalle
+    try:
+        while True:
+            bloc = lire(TAILLE_BLOC)
+            if not bloc:
+                break
+            for t in numeroter_hotes(iterer_trames_lignes(lignes.decouper(bloc), horloge), hotes):
+                compteur.ajouter(t)
+                if debit is not None:
+                    debit.ajouter(t)
+            if time.monotonic() >= prochain:
+                rafraichir_suivi(compteur, intervalle)
+                prochain = time.monotonic() + intervalle
+    except KeyboardInterrupt:
+        pass
+    for t in numeroter_hotes(iterer_trames_lignes(lignes.finir(), horloge), hotes):
+        compteur.ajouter(t)
+        if debit is not None:
+            debit.ajouter(t)
+    rafraichir_suivi(compteur, intervalle)
+    return compteur
 
 # ---------------- interface fichier
 def choisir():
-    chemin = filedialog.askopenfilename(filetypes=[("txt","*.txt")])
+    chemin = filedialog.askopenfilename(filetypes=[
+        ("txt","*.txt"),
+        ("pcap","*.pcap *.cap"),
+        ("pcapng","*.pcapng"),
+        ("compressé","*.gz *.bz2 *.xz"),
+    ])
     if chemin:
         root.destroy()
         lancer_analyse(chemin)
 
 # ---------------- interface principale
-root = tk.Tk()
-root.title("Analyse trafic réseau")
-root.geometry("400x200")
-tk.Button(root,text="Choisir fichier TCPDump",command=choisir).pack(pady=60)
-root.mainloop()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse trafic réseau (sortie tcpdump)")
+    parser.add_argument("fichier", nargs="?",
+                        help="capture à analyser sans boîte de dialogue, - pour lire l'entrée standard, "
+                             "dossier ou motif (\"captures/*.txt\") pour analyser un lot de fichiers")
+    parser.add_argument("--bench", metavar="FICHIER", help="mesurer le gain du pré-filtre hexa sur FICHIER")
+    parser.add_argument("-j", "--processus", type=int, default=1,
+                        help="nombre de processus pour découper la lecture (défaut : 1)")
+    parser.add_argument("--lecteur", choices=["auto"] + sorted(LECTEURS), default="auto",
+                        help="auto : pcap reconnu à son magic, sinon texte ; "
+                             "mmap : regex en octets sur le fichier projeté, sans copie "
+                             "mais sans gain de vitesse sur texte")
+    parser.add_argument("--reprise", action="store_true",
+                        help="sauvegarder régulièrement l'avancement dans FICHIER.reprise.json "
+                             "et repartir de là au lancement suivant")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"garder les trames lues dans {DOSSIER_CACHE}/ : relire la même capture est immédiat")
+    parser.add_argument("--suivre", action="store_true",
+                        help="suivre le fichier pendant que tcpdump l'écrit (Ctrl+C pour arrêter)")
+    parser.add_argument("--intervalle", type=float, default=5.0,
+                        help="mode suivi / entrée standard : secondes entre deux mises à jour du dashboard (défaut : 5)")
+    parser.add_argument("--approx", type=int, metavar="K",
+                        help="IP source comptées en mémoire fixe (K compteurs, top-K approché) "
+                             "au lieu d'un compteur exact par IP")
+    parser.add_argument("--flux", action="store_true",
+                        help="reconstituer les conversations (src, port, dst, port, proto) dans flux.csv, "
+                             f"un flux est clos après {DELAI_INACTIVITE_FLUX} s sans trame")
+    parser.add_argument("--agregats", metavar="NOMS",
+                        help="agrégats calculés en un seul passage, séparés par des virgules : "
+                             + ", ".join(AGREGATS))
+    parser.add_argument("--balayages", action="store_true",
+                        help="repérer les IP source qui visent beaucoup d'hôtes ou de ports distincts")
+    parser.add_argument("--debit", action="store_true",
+                        help="alerter quand une IP source dépasse "
+                             + ", ".join(f"{seuil} trames en {duree} s" for duree, seuil in SEUILS_DEBIT.items())
+                             + " (aussi avec --suivre et -)")
+    parser.add_argument("--tcp", action="store_true",
+                        help="compter les flags TCP et les SYN sans ACK par IP source")
+    parser.add_argument("--protocoles", action="store_true",
+                        help="lire aussi IPv6, ARP, UDP et ICMP et compter les trames par protocole")
+    parser.add_argument("--decompression-sans-thread", action="store_true",
+                        help="décompresser .gz/.bz2/.xz dans le thread principal")
+    args = parser.parse_args()
+    if args.approx and (args.reprise or args.cache):
+        parser.error("--approx ne se combine pas avec --reprise ni --cache (compteur exact)")
+    if args.decompression_sans_thread:
+        DECOMPRESSION_EN_THREAD = False
+
+    if args.bench:
+        mesurer_prefiltre(args.bench)
+    elif args.fichier == "-":
+        lire_entree_standard(args.intervalle, debit=MoteurDebit(signaler=afficher_alerte) if args.debit else None)
+    elif args.fichier and (os.path.isdir(args.fichier) or any(c in args.fichier for c in "*?[")):
+        lancer_lot(args.fichier, args.processus, interface=False)
+    elif args.fichier and args.agregats:
+        lancer_agregats(args.fichier, [nom.strip() for nom in args.agregats.split(",") if nom.strip()])
+    elif args.fichier and args.balayages:
+        lancer_balayages(args.fichier)
+    elif args.fichier and args.protocoles:
+        lancer_protocoles(args.fichier)
+    elif args.fichier and args.tcp:
+        lancer_tcp(args.fichier)
+    elif args.fichier and args.suivre:
+        suivre_fichier(args.fichier, args.intervalle, debit=MoteurDebit(signaler=afficher_alerte) if args.debit else None)
+    elif args.fichier and args.debit:
+        lancer_debit(args.fichier)
+    elif args.fichier:
+        lancer_analyse(args.fichier, args.processus, interface=False, lecteur=args.lecteur,
+                       reprise=args.reprise, cache=args.cache, approx=args.approx, flux=args.flux)
+    else:
+        root = tk.Tk()
+        root.title("Analyse trafic réseau")
+        root.geometry("400x200")
+        tk.Button(root,text="Choisir fichier TCPDump",command=choisir).pack(pady=60)
+        root.mainloop()
+